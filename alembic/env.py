@@ -14,7 +14,7 @@ from app.db.models.base import Base
 from app.db.models import (
     Admin, Client, ClientRequest, 
     ConfirmationRequest, Note, PsychologistRequest,
-    Psychologist
+    Psychologist, EmailOutbox, NoteEmotionDaily, NoteTombstone
 )
 
 load_dotenv()
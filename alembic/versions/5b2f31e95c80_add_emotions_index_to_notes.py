@@ -0,0 +1,32 @@
+"""Add emotions index to notes
+
+Revision ID: 5b2f31e95c80
+Revises: 822870735016
+Create Date: 2026-10-19 15:49:30.427716
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b2f31e95c80'
+down_revision: Union[str, None] = '822870735016'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gin")
+    with op.get_context().autocommit_block():
+        op.create_index('idx_notes_client_emotions', 'notes', ['client_id', 'emotions'], unique=False,
+                        postgresql_using='gin', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('idx_notes_client_emotions', table_name='notes', postgresql_using='gin',
+                      postgresql_concurrently=True)
+    op.execute("DROP EXTENSION IF EXISTS btree_gin")
@@ -0,0 +1,29 @@
+"""Add note tombstones deletedAt index
+
+Revision ID: 661279b02100
+Revises: 7026d002ca22
+Create Date: 2026-10-19 18:02:41.275513
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '661279b02100'
+down_revision: Union[str, None] = '7026d002ca22'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index('idx_note_tombstones_deleted', 'note_tombstones', ['deletedAt'], unique=False,
+                        postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('idx_note_tombstones_deleted', table_name='note_tombstones', postgresql_concurrently=True)
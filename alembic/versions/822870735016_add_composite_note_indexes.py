@@ -0,0 +1,38 @@
+"""Add composite note indexes
+
+Revision ID: 822870735016
+Revises: 9c8b8fb6023a
+Create Date: 2026-10-19 15:27:08.913264
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '822870735016'
+down_revision: Union[str, None] = '9c8b8fb6023a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY keeps notes writable while the indexes are built, it can't run inside a transaction.
+    # If a build fails it leaves an INVALID index behind, drop it before running the migration again.
+    with op.get_context().autocommit_block():
+        op.create_index('idx_notes_client_created', 'notes',
+                        ['client_id', sa.text('"createdAt" DESC'), sa.text('note_id DESC')],
+                        unique=False, postgresql_concurrently=True)
+        op.create_index('idx_notes_client_title', 'notes', ['client_id', 'title', 'note_id'],
+                        unique=False, postgresql_concurrently=True)
+        # every client_id lookup is served by the composite indexes now
+        op.drop_index('idx_notes_client_id', table_name='notes', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index('idx_notes_client_id', 'notes', ['client_id'], unique=False, postgresql_concurrently=True)
+        op.drop_index('idx_notes_client_title', table_name='notes', postgresql_concurrently=True)
+        op.drop_index('idx_notes_client_created', table_name='notes', postgresql_concurrently=True)
@@ -0,0 +1,39 @@
+"""Index confirmation codes
+
+Revision ID: 865fbd82ab49
+Revises: 008c4baf6b8d
+Create Date: 2026-10-19 14:02:11.518204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '865fbd82ab49'
+down_revision: Union[str, None] = '008c4baf6b8d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # codes were never checked for uniqueness, keep only the newest row of a duplicated code
+    op.execute(
+        """
+        DELETE FROM confirmation_requests a
+        USING confirmation_requests b
+        WHERE a.code = b.code AND a.confirmation_id < b.confirmation_id
+        """
+    )
+    op.create_index('idx_confirmation_requests_code', 'confirmation_requests', ['code'], unique=True)
+    op.create_index('idx_confirmation_requests_pending', 'confirmation_requests', ['client_id', 'type'],
+                    unique=False, postgresql_where=sa.text('"confirmedAt" IS NULL'))
+    op.create_index('idx_confirmation_requests_created_at', 'confirmation_requests', ['createdAt'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_confirmation_requests_created_at', table_name='confirmation_requests')
+    op.drop_index('idx_confirmation_requests_pending', table_name='confirmation_requests')
+    op.drop_index('idx_confirmation_requests_code', table_name='confirmation_requests')
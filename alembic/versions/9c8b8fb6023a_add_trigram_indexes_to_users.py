@@ -0,0 +1,46 @@
+"""Add trigram indexes to users
+
+Revision ID: 9c8b8fb6023a
+Revises: 9f46477dcb5a
+Create Date: 2026-10-19 15:03:52.640718
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c8b8fb6023a'
+down_revision: Union[str, None] = '9f46477dcb5a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+TRIGRAM_INDEXES = [
+    ('idx_clients_login_trgm', 'clients', 'login'),
+    ('idx_clients_email_trgm', 'clients', 'email'),
+    ('idx_clients_first_name_trgm', 'clients', 'first_name'),
+    ('idx_clients_last_name_trgm', 'clients', 'last_name'),
+    ('idx_psychologists_login_trgm', 'psychologists', 'login'),
+    ('idx_psychologists_email_trgm', 'psychologists', 'email'),
+    ('idx_psychologists_first_name_trgm', 'psychologists', 'first_name'),
+    ('idx_psychologists_last_name_trgm', 'psychologists', 'last_name'),
+]
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # the user tables stay writable while the indexes are built
+    with op.get_context().autocommit_block():
+        for index_name, table_name, column in TRIGRAM_INDEXES:
+            op.create_index(index_name, table_name, [column], unique=False, postgresql_using='gin',
+                            postgresql_ops={column: 'gin_trgm_ops'}, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for index_name, table_name, _ in reversed(TRIGRAM_INDEXES):
+            op.drop_index(index_name, table_name=table_name, postgresql_concurrently=True)
+    op.execute("DROP EXTENSION IF EXISTS pg_trgm")
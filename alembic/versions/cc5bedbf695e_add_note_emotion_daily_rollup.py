@@ -0,0 +1,93 @@
+"""Add note_emotion_daily rollup
+
+Revision ID: cc5bedbf695e
+Revises: 5b2f31e95c80
+Create Date: 2026-10-19 16:12:44.083517
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'cc5bedbf695e'
+down_revision: Union[str, None] = '5b2f31e95c80'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('note_emotion_daily',
+    sa.Column('client_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('emotion', postgresql.ENUM(name='emotions', create_type=False), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['client_id'], ['clients.client_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('client_id', 'day', 'emotion')
+    )
+
+    # The trigger keeps the rollup in step with every write path, ORM and bulk statements alike.
+    # A delete only decrements: when a client is deleted its rollup rows may already be gone by then.
+    op.execute(
+        """
+        CREATE FUNCTION notes_emotion_rollup() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.emotions IS NOT NULL THEN
+                UPDATE note_emotion_daily r
+                SET count = r.count - e.n
+                FROM (SELECT emotion, count(*) AS n FROM unnest(OLD.emotions) AS emotion GROUP BY emotion) e
+                WHERE r.client_id = OLD.client_id
+                  AND r.day = (OLD."createdAt" AT TIME ZONE 'UTC')::date
+                  AND r.emotion = e.emotion;
+            END IF;
+
+            IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.emotions IS NOT NULL THEN
+                INSERT INTO note_emotion_daily (client_id, day, emotion, count)
+                SELECT NEW.client_id, (NEW."createdAt" AT TIME ZONE 'UTC')::date, emotion, count(*)
+                FROM unnest(NEW.emotions) AS emotion
+                GROUP BY emotion
+                ON CONFLICT (client_id, day, emotion) DO UPDATE SET count = note_emotion_daily.count + EXCLUDED.count;
+            END IF;
+
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER notes_emotion_rollup_insert_delete
+        AFTER INSERT OR DELETE ON notes
+        FOR EACH ROW EXECUTE FUNCTION notes_emotion_rollup()
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER notes_emotion_rollup_update
+        AFTER UPDATE OF emotions, client_id, "createdAt" ON notes
+        FOR EACH ROW
+        WHEN (OLD.emotions IS DISTINCT FROM NEW.emotions
+              OR OLD.client_id IS DISTINCT FROM NEW.client_id
+              OR OLD."createdAt" IS DISTINCT FROM NEW."createdAt")
+        EXECUTE FUNCTION notes_emotion_rollup()
+        """
+    )
+
+    op.execute(
+        """
+        INSERT INTO note_emotion_daily (client_id, day, emotion, count)
+        SELECT n.client_id, (n."createdAt" AT TIME ZONE 'UTC')::date, emotion, count(*)
+        FROM notes n, unnest(n.emotions) AS emotion
+        GROUP BY 1, 2, 3
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER notes_emotion_rollup_update ON notes")
+    op.execute("DROP TRIGGER notes_emotion_rollup_insert_delete ON notes")
+    op.execute("DROP FUNCTION notes_emotion_rollup()")
+    op.drop_table('note_emotion_daily')
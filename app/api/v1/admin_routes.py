@@ -1,3 +1,5 @@
+from typing import Optional
+
 from fastapi import APIRouter, Depends, Query, HTTPException
 
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -7,14 +9,22 @@ from app.schemas.client_request import ClientRequestUpdate
 from app.schemas.admin import (
     PaginatedResponse, ClientResponse, 
     PsychologistResponse, ClientRequestResponse,
-    AdminResponse, AdminCreate
+    AdminResponse, AdminCreate, ModelRegistryResponse, EmailOutboxResponse,
+    StaleNotesResponse, RecomputeNotesResponse, UserSearchResponse
 )
 from app.services.client_request_service import update_client_request
 from app.services.admin_service import (
     get_all_clients, get_all_psychologists, 
     delete_client, delete_psychologist, get_all_confirmation_requests,
-    get_all_admins, create_admin
+    get_all_admins, create_admin, get_password_hashing_stats_service,
+    get_dead_emails, retry_dead_email, get_email_delivery_stats_service,
+    search_clients, search_psychologists
+)
+from app.services.model_service import (
+    get_models_service, activate_model_service,
+    get_stale_notes_service, recompute_stale_notes_service
 )
+from app.ml_service import ThreadSafeModelHandler, ModelRegistry
 from app.dependencies import get_db, get_current_admin
 
 router = APIRouter(tags=["Admin"])
@@ -55,22 +65,56 @@ async def update_psychologist_application_status(
 async def get_clients(
     page: int = Query(1, ge=1),
     size: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Cursor of the page to read, overrides page"),
+    estimate_total: bool = Query(False, description="Return an estimated total instead of counting all rows"),
     admin_user=Depends(get_current_admin),
     db: AsyncSession = Depends(get_db)
 ):
     """Get all clients with pagination."""
-    return await get_all_clients(db, page, size)
+    return await get_all_clients(db, page, size, cursor, estimate_total)
 
 
 @router.get("/admin/psychologists", response_model=PaginatedResponse[PsychologistResponse])
 async def get_psychologists(
     page: int = Query(1, ge=1),
     size: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Cursor of the page to read, overrides page"),
+    estimate_total: bool = Query(False, description="Return an estimated total instead of counting all rows"),
     admin_user=Depends(get_current_admin),
     db: AsyncSession = Depends(get_db)
 ):
     """Get all psychologists with pagination."""
-    return await get_all_psychologists(db, page, size)
+    return await get_all_psychologists(db, page, size, cursor, estimate_total)
+
+
+@router.get("/admin/clients/search", response_model=UserSearchResponse[ClientResponse])
+async def search_clients_endpoint(
+    q: str = Query(..., min_length=3, max_length=100),
+    mode: str = Query("prefix", pattern="^(prefix|fuzzy)$"),
+    limit: int = Query(20, ge=1, le=50),
+    admin_user=Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Search clients by login, email or name.
+    - mode: 'prefix' for values starting with q, 'fuzzy' for values similar to q
+    """
+    return await search_clients(q, db, mode, limit)
+
+
+@router.get("/admin/psychologists/search", response_model=UserSearchResponse[PsychologistResponse])
+async def search_psychologists_endpoint(
+    q: str = Query(..., min_length=3, max_length=100),
+    mode: str = Query("prefix", pattern="^(prefix|fuzzy)$"),
+    limit: int = Query(20, ge=1, le=50),
+    admin_user=Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Search psychologists by login, email or name.
+    - mode: 'prefix' for values starting with q, 'fuzzy' for values similar to q
+    """
+    return await search_psychologists(q, db, mode, limit)
 
 
 @router.delete("/admin/client/delete/{user_id}")
@@ -97,22 +141,26 @@ async def delete_psychologist_endpoint(
 async def get_confirmation_requests(
     page: int = Query(1, ge=1),
     size: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Cursor of the page to read, overrides page"),
+    estimate_total: bool = Query(False, description="Return an estimated total instead of counting all rows"),
     admin_user=Depends(get_current_admin),
     db: AsyncSession = Depends(get_db)
 ):
     """Get all confirmation requests with pagination."""
-    return await get_all_confirmation_requests(db, page, size)
+    return await get_all_confirmation_requests(db, page, size, cursor, estimate_total)
 
 
 @router.get("/admin/admins", response_model=PaginatedResponse[AdminResponse])
 async def get_admins(
     page: int = Query(1, ge=1),
     size: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Cursor of the page to read, overrides page"),
+    estimate_total: bool = Query(False, description="Return an estimated total instead of counting all rows"),
     admin_user=Depends(get_current_admin),
     db: AsyncSession = Depends(get_db)
 ):
     """Get all admins with pagination."""
-    return await get_all_admins(db, page, size)
+    return await get_all_admins(db, page, size, cursor, estimate_total)
 
 
 @router.post("/admin/create", response_model=AdminResponse)
@@ -125,3 +173,83 @@ async def create_admin_endpoint(
     if admin_user.admin_id != 1:  # only base admin can create new admins
         raise HTTPException(403, "The access is forbidden")
     return await create_admin(admin.login, admin.password, db)
+
+
+@router.get("/admin/models", response_model=ModelRegistryResponse)
+async def get_models(
+    admin_user=Depends(get_current_admin),
+    registry: ModelRegistry = Depends(),
+    model_handler: ThreadSafeModelHandler = Depends()
+):
+    """List model versions from the registry and the active one."""
+    return get_models_service(registry, model_handler)
+
+
+@router.post("/admin/models/{version}/activate")
+async def activate_model(
+    version: str,
+    admin_user=Depends(get_current_admin),
+    registry: ModelRegistry = Depends(),
+    model_handler: ThreadSafeModelHandler = Depends()
+):
+    """Load, warm up and switch traffic to another model version without a restart."""
+    return await activate_model_service(version, registry, model_handler)
+
+
+@router.get("/admin/models/stale-notes", response_model=StaleNotesResponse)
+async def get_stale_notes(
+    admin_user=Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db),
+    model_handler: ThreadSafeModelHandler = Depends()
+):
+    """Count notes analyzed by a model version other than the active one."""
+    return await get_stale_notes_service(db, model_handler)
+
+
+@router.post("/admin/models/stale-notes/recompute", response_model=RecomputeNotesResponse)
+async def recompute_stale_notes(
+    limit: int = Query(20, ge=1, le=100),
+    admin_user=Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db),
+    model_handler: ThreadSafeModelHandler = Depends()
+):
+    """Re-analyze a batch of stale notes with the active model version, call it again while notes remain."""
+    return await recompute_stale_notes_service(db, model_handler, limit)
+
+
+@router.get("/admin/metrics/password-hashing")
+async def get_password_hashing_stats(
+    admin_user=Depends(get_current_admin)
+):
+    """Queue depth and timings of the password hashing pool (per worker)."""
+    return get_password_hashing_stats_service()
+
+
+@router.get("/admin/metrics/email")
+async def get_email_delivery_stats(
+    admin_user=Depends(get_current_admin)
+):
+    """Connection reuse and throughput of the SMTP connection pool (per worker)."""
+    return get_email_delivery_stats_service()
+
+
+@router.get("/admin/email-outbox/dead", response_model=PaginatedResponse[EmailOutboxResponse])
+async def get_dead_email_outbox(
+    page: int = Query(1, ge=1),
+    size: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Cursor of the page to read, overrides page"),
+    admin_user=Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get emails whose delivery gave up after all retries."""
+    return await get_dead_emails(db, page, size, cursor)
+
+
+@router.post("/admin/email-outbox/{outbox_id}/retry")
+async def retry_dead_email_outbox(
+    outbox_id: int,
+    admin_user=Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db)
+):
+    """Queue a dead email for delivery again."""
+    return await retry_dead_email(outbox_id, db)
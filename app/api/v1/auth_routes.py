@@ -20,7 +20,7 @@ from app.services.user_service import register_user_service, login_user_service,
 from app.services.auth_service import confirm_email_service, pass_reset_confirmation_service
 from app.services.admin_service import login_admin_service
 from app.dependencies import get_current_user
-from app.core import send_confirmation_email, settings
+from app.core import enqueue_confirmation_email, settings
 
 router = APIRouter(tags=["UserAuthentication"])
 
@@ -151,12 +151,8 @@ async def send_new_email_confirmation(current_user: Client | Psychologist = Depe
         type=EmailConfirmationTypeEnum.REGISTRATION
     )
 
-    try:
-        await send_confirmation_email(current_user.email, confirmation_code, "registration")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail="Failed to send confirmation email")
-
     db.add(new_confirmation_request)
+    enqueue_confirmation_email(db, current_user.email, confirmation_code, "registration")
     await db.commit()
 
     return {"message": "Confirmation email sent."}
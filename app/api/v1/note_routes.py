@@ -1,18 +1,27 @@
-from datetime import datetime
-from typing import Optional
+from datetime import date, datetime
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.services.note_service import (
     create_note, delete_note, 
     update_note, get_client_notes_service, 
-    get_note_by_id_service, analyze_note
+    get_note_by_id_service, analyze_note,
+    get_similar_notes_service, get_mood_summary_service,
+    stream_client_notes_service, search_notes_service, get_mood_trends_service,
+    sync_notes_service, batch_notes_service
+)
+from app.schemas.note import (
+    NoteCreate, NoteResponse, NoteUpdate, NotesResponse,
+    NoteAnalysisResponse, SimilarNotesResponse, MoodSummaryResponse, NoteSearchResponse,
+    MoodTrendsResponse, NoteSyncResponse, NoteBatchRequest, NoteBatchResponse
 )
-from app.schemas.note import NoteCreate, NoteResponse, NoteUpdate, NotesResponse, NoteAnalysisResponse
 from app.dependencies import get_current_user, get_db
 from app.db.models import Client
+from app.db.enums import EmotionsEnum
 from app.ml_service import ThreadSafeModelHandler
 
 
@@ -30,6 +39,23 @@ async def create_new_note(
     return await create_note(current_user.client_id, note_data, db)
 
 
+@router.post("/notes/batch", response_model=NoteBatchResponse)
+async def batch_notes(
+    batch: NoteBatchRequest,
+    current_user: Client = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Create, update and delete many notes of the authenticated client in one transaction.
+    - op: 'create' (data: title, body), 'update' (note_id, data: title, body, emotions) or 'delete' (note_id)
+
+    Creates run first, then updates, then deletes. Every operation gets its own result with a status;
+    operations on missing or foreign notes are skipped without failing the others.
+    A malformed operation rejects the whole request with 422.
+    """
+    return await batch_notes_service(current_user.client_id, batch, db)
+
+
 @router.delete("/note/delete/{note_id}")
 async def delete_note_by_id(
     note_id: int,
@@ -63,7 +89,12 @@ async def get_client_notes(
     sort_order: str = "desc",
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
-    search: Optional[str] = None
+    search: Optional[str] = None,
+    size: Optional[int] = Query(None, ge=1, le=100),
+    cursor: Optional[str] = None,
+    stream: bool = False,
+    emotions: Optional[List[EmotionsEnum]] = Query(None),
+    emotion_match: str = Query("any", pattern="^(any|all)$")
 ):
     """
     Get all notes for the authenticated client with sorting, filtering, and search.
@@ -71,13 +102,90 @@ async def get_client_notes(
     - sort_order: 'asc' or 'desc'
     - start_date: Filter notes created after this date (ISO format)
     - end_date: Filter notes created before this date (ISO format)
-    - search: Search term in title
+    - search: Full-text search in titles and bodies
+    - size, cursor: Return one page of notes, follow next_cursor/prev_cursor for the neighbouring pages
+    - stream: Stream all notes as NDJSON (one note per line) instead of a single JSON document
+    - emotions: Only notes with these emotions, repeat the parameter for several emotions
+    - emotion_match: 'any' for notes with any of the emotions, 'all' for notes with all of them
     """
+    if stream:
+        return StreamingResponse(
+            stream_client_notes_service(
+                current_user.client_id, sort_by, sort_order, start_date, end_date, search, emotions, emotion_match
+            ),
+            media_type="application/x-ndjson"
+        )
     return await get_client_notes_service(
-        current_user.client_id, db, sort_by, sort_order, start_date, end_date, search
+        current_user.client_id, db, sort_by, sort_order, start_date, end_date, search, size, cursor,
+        emotions, emotion_match
     )
 
 
+@router.get("/notes/sync", response_model=NoteSyncResponse)
+async def sync_notes(
+    cursor: Optional[str] = None,
+    limit: int = Query(500, ge=1, le=1000),
+    current_user: Client = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get the changes of the authenticated client's notes since the previous sync.
+    - cursor: The cursor returned by the previous sync, omit it for a full sync
+    - limit: Maximum number of changed notes (and of deleted notes) per response
+
+    Repeat the call with the returned cursor while has_more is true. Applying a change twice is harmless.
+    Deletions are kept for a limited time: if full_resync_required is true, sync again without a cursor.
+    """
+    return await sync_notes_service(current_user.client_id, db, cursor, limit)
+
+
+@router.get("/notes/search", response_model=NoteSearchResponse)
+async def search_notes(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    current_user: Client = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Full-text search over the authenticated client's notes, ranked by relevance, with highlighted snippets.
+    - q: Words to find; "quoted phrases", "or" and "-excluded" words are supported
+    - limit: Maximum number of results
+    """
+    return await search_notes_service(current_user.client_id, q, db, limit)
+
+
+@router.get("/notes/mood-summary", response_model=MoodSummaryResponse)
+async def get_mood_summary(
+    current_user: Client = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None
+):
+    """
+    Get the average probability of every emotion over the authenticated client's analyzed notes.
+    - start_date: Only notes created after this date (ISO format)
+    - end_date: Only notes created before this date (ISO format)
+    """
+    return await get_mood_summary_service(current_user.client_id, db, start_date, end_date)
+
+
+@router.get("/notes/trends", response_model=MoodTrendsResponse)
+async def get_mood_trends(
+    bucket: str = Query("week", pattern="^(day|week|month)$"),
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    current_user: Client = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get the number of the authenticated client's notes with every emotion over time.
+    - bucket: 'day', 'week' or 'month'
+    - start_date: First day to include (ISO format)
+    - end_date: Last day to include (ISO format)
+    """
+    return await get_mood_trends_service(current_user.client_id, db, bucket, start_date, end_date)
+
+
 @router.get("/note/{note_id}", response_model=NoteResponse)
 async def get_note_by_id(
     note_id: int,
@@ -95,9 +203,24 @@ async def analyze_note_by_id(
     note_id: int,
     current_user: Client = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
-    model_handler: ThreadSafeModelHandler = Depends()
+    model_handler: ThreadSafeModelHandler = Depends(),
+    detailed: bool = False
 ):
     """
     Analyze a specific note by its ID and return the top 3 predicted emotions.
+    - detailed: also return the top 3 emotions of every sentence (computed in one batch)
+    """
+    return await analyze_note(note_id, current_user.client_id, db, model_handler, detailed)
+
+
+@router.get("/note/{note_id}/similar", response_model=SimilarNotesResponse)
+async def get_similar_notes(
+    note_id: int,
+    limit: int = Query(5, ge=1, le=50),
+    current_user: Client = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get the authenticated client's past notes most similar to an analyzed note.
     """
-    return await analyze_note(note_id, current_user.client_id, db, model_handler)
+    return await get_similar_notes_service(note_id, current_user.client_id, db, limit)
@@ -1,18 +1,24 @@
+from typing import List, Optional
+
 from fastapi import APIRouter, Depends, Query, HTTPException
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.models import Psychologist
+from app.db.enums import EmotionsEnum
 from app.services.psychologist_service import (
     get_psychologist_document, revert_to_client,
     get_psychologist_clients, get_client_notes_for_psychologist,
     search_client_by_login, create_psychologist_request, 
-    remove_client_from_psychologist
+    remove_client_from_psychologist, get_similar_client_notes_for_psychologist,
+    search_clients_service, get_caseload_dashboard_service
 )
 from app.schemas.psychologist import (
     DocumentResponse, PaginatedResponse, 
-    ClientBase, NoteResponse, PsychologistRequestResponse
+    ClientBase, NoteResponse, PsychologistRequestResponse, ClientSearchResponse,
+    DashboardResponse
 )
+from app.schemas.note import SimilarNotesResponse
 from app.dependencies import get_current_user, get_db
 
 
@@ -45,13 +51,26 @@ async def revert_to_client_endpoint(
 async def get_clients(
     page: int = Query(1, ge=1),
     size: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Cursor of the page to read, overrides page"),
     db: AsyncSession = Depends(get_db),
     psychologist: Psychologist = Depends(get_current_user)
 ):
     """Get list of clients for the psychologist."""
     if type(psychologist) is not Psychologist:
         raise HTTPException(status_code=403, detail="Access forbidden: not a psychologist")
-    return await get_psychologist_clients(psychologist.client_id, db, page, size)
+    return await get_psychologist_clients(psychologist.client_id, db, page, size, cursor)
+
+
+@router.get("/psychologist/dashboard", response_model=DashboardResponse)
+async def get_dashboard(
+    days: int = Query(30, ge=1, le=365),
+    db: AsyncSession = Depends(get_db),
+    psychologist: Psychologist = Depends(get_current_user)
+):
+    """Get the recent activity of all the psychologist's clients: last note, note count and dominant emotions."""
+    if type(psychologist) is not Psychologist:
+        raise HTTPException(status_code=403, detail="Access forbidden: not a psychologist")
+    return await get_caseload_dashboard_service(psychologist.client_id, db, days)
 
 
 @router.get("/psychologist/clients/{client_id}/notes", response_model=PaginatedResponse[NoteResponse])
@@ -59,13 +78,32 @@ async def get_client_notes(
     client_id: int,
     page: int = Query(1, ge=1),
     size: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Cursor of the page to read, overrides page"),
+    emotions: Optional[List[EmotionsEnum]] = Query(None, description="Only notes with these emotions"),
+    emotion_match: str = Query("any", pattern="^(any|all)$", description="'any' or 'all' of the emotions"),
     db: AsyncSession = Depends(get_db),
     psychologist: Psychologist = Depends(get_current_user)
 ):
     """Get notes of a specific client for the psychologist."""
     if type(psychologist) is not Psychologist:
         raise HTTPException(status_code=403, detail="Access forbidden: not a psychologist")
-    return await get_client_notes_for_psychologist(psychologist.client_id, client_id, db, page, size)
+    return await get_client_notes_for_psychologist(
+        psychologist.client_id, client_id, db, page, size, cursor, emotions, emotion_match
+    )
+
+
+@router.get("/psychologist/clients/{client_id}/notes/{note_id}/similar", response_model=SimilarNotesResponse)
+async def get_similar_client_notes(
+    client_id: int,
+    note_id: int,
+    limit: int = Query(5, ge=1, le=50),
+    db: AsyncSession = Depends(get_db),
+    psychologist: Psychologist = Depends(get_current_user)
+):
+    """Get the client's past notes most similar to one of their analyzed notes."""
+    if type(psychologist) is not Psychologist:
+        raise HTTPException(status_code=403, detail="Access forbidden: not a psychologist")
+    return await get_similar_client_notes_for_psychologist(psychologist.client_id, client_id, note_id, db, limit)
 
 
 @router.get("/psychologist/search-client", response_model=ClientBase)
@@ -79,6 +117,24 @@ async def search_client(
         raise HTTPException(status_code=403, detail="Access forbidden: not a psychologist")
     return await search_client_by_login(login, db)
 
+
+@router.get("/psychologist/search-clients", response_model=ClientSearchResponse)
+async def search_clients(
+    q: str = Query(..., min_length=3, max_length=100),
+    mode: str = Query("prefix", pattern="^(prefix|fuzzy)$"),
+    limit: int = Query(20, ge=1, le=50),
+    db: AsyncSession = Depends(get_db),
+    psychologist: Psychologist = Depends(get_current_user)
+):
+    """
+    Search clients by login, only their id and login are returned.
+    - mode: 'prefix' for logins starting with q, 'fuzzy' for logins similar to q
+    """
+    if type(psychologist) is not Psychologist:
+        raise HTTPException(status_code=403, detail="Access forbidden: not a psychologist")
+    return await search_clients_service(q, db, mode, limit)
+
+
 @router.post("/psychologist/request-client/{client_id}", response_model=PsychologistRequestResponse)
 async def create_request(
     client_id: int,
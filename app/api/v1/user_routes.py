@@ -51,8 +51,10 @@ async def update_profile(
     """
     Update the current user's profile information.
     """
+    # the type comes from the token, ids of clients and psychologists overlap
+    user_type = UserTypeEnum.CLIENT if type(current_user) is Client else UserTypeEnum.PSYCHOLOGIST
     try:
-        return await update_user_profile_service(current_user.login, update_data, db)
+        return await update_user_profile_service(current_user.client_id, user_type, update_data, db)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -78,8 +80,10 @@ async def update_profile_photo(
     if file_extension not in settings.ALLOWED_PROFILE_IMAGE_EXTENSIONS:
         raise HTTPException(status_code=400, detail="Unsupported file format. Use .jpg, .jpeg, or .png")
 
+    # the type comes from the token, ids of clients and psychologists overlap
+    user_type = UserTypeEnum.CLIENT if type(current_user) is Client else UserTypeEnum.PSYCHOLOGIST
     update_data = {"photo": photo, "user_type": user_type}
-    return await update_user_photo(current_user.login, update_data, db)
+    return await update_user_photo(current_user.client_id, update_data, db)
 
 
 @router.post("/user/apply-for-psychologist")
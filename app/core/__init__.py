@@ -1,3 +1,9 @@
 from .config import settings
-from .security import hash_password, verify_password, create_jwt_token
-from .email import send_confirmation_email, send_client_request_notification
+from .security import (
+    hash_password, verify_password, hash_password_async, verify_password_async,
+    password_needs_rehash, create_jwt_token, create_user_jwt_token
+)
+from .email import (
+    send_confirmation_email, send_client_request_notification,
+    enqueue_email, enqueue_confirmation_email
+)
@@ -7,6 +7,19 @@ class Settings(BaseSettings):
     ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
 
+    # Authenticated users are cached per worker, the TTL bounds staleness across workers
+    PRINCIPAL_CACHE_SIZE: int = 10000
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 30
+
+    # bcrypt runs in a dedicated thread pool, calls beyond the queue limit are rejected with 503
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_QUEUE: int = 64
+    # bcrypt cost: fixed with BCRYPT_ROUNDS, otherwise calibrated at startup to hash in about BCRYPT_TARGET_MS
+    BCRYPT_ROUNDS: int | None = None
+    BCRYPT_TARGET_MS: int = 250
+    BCRYPT_MIN_ROUNDS: int = 10
+    BCRYPT_MAX_ROUNDS: int = 15
+
     MAX_FILE_SIZE: int = 2 * 1024 * 1024  # 2MB
     ALLOWED_PROFILE_IMAGE_EXTENSIONS: set = {".jpg", ".jpeg", ".png"}
     ALLOWED_REQUEST_EXTENTIONS: set = {".pdf",}
@@ -19,12 +32,47 @@ class Settings(BaseSettings):
     MAIL_SERVER: str
     MAIL_TLS: bool
     MAIL_SSL: bool
+    MAIL_USE_CREDENTIALS: bool = False  # log in with MAIL_USERNAME / MAIL_PASSWORD
     CODE_EXPIRE_MINUTES: int
 
+    # Expired confirmation codes are deleted by a background worker
+    CONFIRMATION_PURGE_INTERVAL_SECONDS: float = 600
+    CONFIRMATION_PURGE_BATCH_SIZE: int = 500
+
+    # Emails are written to an outbox table and delivered by a background worker
+    SMTP_POOL_SIZE: int = 2
+    SMTP_POOL_MAX_MESSAGES_PER_CONNECTION: int = 100
+    SMTP_POOL_IDLE_SECONDS: float = 60
+    SMTP_TIMEOUT_SECONDS: float = 30
+    EMAIL_OUTBOX_POLL_SECONDS: float = 2
+    EMAIL_OUTBOX_BATCH_SIZE: int = 20
+    EMAIL_OUTBOX_MAX_ATTEMPTS: int = 8
+    EMAIL_OUTBOX_BACKOFF_SECONDS: int = 30
+    EMAIL_OUTBOX_MAX_BACKOFF_SECONDS: int = 3600
+    EMAIL_OUTBOX_CLAIM_SECONDS: int = 300  # how long a claimed batch is hidden from other workers while it is sent
+    EMAIL_OUTBOX_SENT_RETENTION_HOURS: int = 24
+    EMAIL_OUTBOX_DEAD_RETENTION_DAYS: int = 30
+    EMAIL_OUTBOX_PURGE_INTERVAL_SECONDS: float = 600
+    EMAIL_OUTBOX_PURGE_BATCH_SIZE: int = 500
+
     MEDIA_DIRECTORY: str
     DOCUMENTS_DIRECTORY: str
 
     MODEL_PATH: str
+    MODEL_VERSION: str = "default"  # version label of MODEL_PATH when no registry is configured
+    MODEL_REGISTRY_DIRECTORY: str | None = None
+    MODEL_REGISTRY_POLL_SECONDS: int = 30
+
+    AUTO_ANALYZE_NOTES: bool = False  # analyze notes in the background after every create/update
+    AUTO_ANALYZE_DEBOUNCE_SECONDS: float = 10
+
+    NOTES_STREAM_CHUNK_SIZE: int = 500
+    NOTES_SYNC_SETTLE_SECONDS: float = 5
+    NOTES_SYNC_TOMBSTONE_RETENTION_DAYS: int = 30  # older sync cursors need a full sync
+    NOTES_TOMBSTONE_PURGE_INTERVAL_SECONDS: float = 3600
+    NOTES_TOMBSTONE_PURGE_BATCH_SIZE: int = 500
+    EMBEDDING_INDEX_MAX_CLIENTS: int = 1000
+    EMBEDDING_INDEX_TTL_SECONDS: int = 300
 
     class Config:
         env_file = ".env"
@@ -1,24 +1,13 @@
-from fastapi_mail import FastMail, MessageSchema, ConnectionConfig
-from app.core.config import settings
+from email.message import EmailMessage
 
-conf = ConnectionConfig(
-    MAIL_USERNAME=settings.MAIL_USERNAME,
-    MAIL_PASSWORD=settings.MAIL_PASSWORD,
-    MAIL_FROM=settings.MAIL_FROM,
-    MAIL_PORT=settings.MAIL_PORT,
-    MAIL_SERVER=settings.MAIL_SERVER,
-    # MAIL_TLS=settings.MAIL_TLS,
-    # MAIL_SSL=settings.MAIL_SSL,
-    MAIL_STARTTLS=False,
-    MAIL_SSL_TLS=False,
-    USE_CREDENTIALS=False,
-    VALIDATE_CERTS=True
-)
+from sqlalchemy.ext.asyncio import AsyncSession
 
-fast_mail = FastMail(conf)
+from app.core.config import settings
+from app.core.smtp import smtp_pool
+from app.db.models import EmailOutbox
 
 
-async def send_confirmation_email(email: str, code: str, action: str):
+def render_confirmation_email(code: str, action: str) -> tuple[str, str]:
     subject = f"Подтверждение {action}"
     body = f"""
     <h2>Подтверждение {action}</h2>
@@ -26,23 +15,41 @@ async def send_confirmation_email(email: str, code: str, action: str):
     <p>У вас есть <b>3 часа</b> для подтверждения аккаунта.</p>
     <p>Если вы не запрашивали это действие, проигнорируйте это письмо.</p>
     """
+    return subject, body
+
+
+def build_email_message(email: str, subject: str, body: str) -> EmailMessage:
+    message = EmailMessage()
+    message["From"] = settings.MAIL_FROM
+    message["To"] = email
+    message["Subject"] = subject
+    message.set_content(body, subtype="html")
+    return message
+
+
+async def send_email(email: str, subject: str, body: str):
+    await smtp_pool.send(build_email_message(email, subject, body))
 
-    message = MessageSchema(
-        subject=subject,
-        recipients=[email],
-        body=body,
-        subtype="html"
-    )
 
-    await fast_mail.send_message(message)
+async def send_confirmation_email(email: str, code: str, action: str):
+    subject, body = render_confirmation_email(code, action)
+    await send_email(email, subject, body)
 
 
 async def send_client_request_notification(email: str, subject: str, body: str):
-    message = MessageSchema(
-        subject=subject,
-        recipients=[email],
-        body=body,
-        subtype="html"
-    )
-
-    await fast_mail.send_message(message)
+    await send_email(email, subject, body)
+
+
+def enqueue_email(db: AsyncSession, email: str, subject: str, body: str) -> EmailOutbox:
+    """
+    Add an email to the outbox within the caller's transaction, so it is stored only if the transaction commits.
+    The outbox worker delivers it in the background.
+    """
+    message = EmailOutbox(recipient=email, subject=subject, body=body)
+    db.add(message)
+    return message
+
+
+def enqueue_confirmation_email(db: AsyncSession, email: str, code: str, action: str) -> EmailOutbox:
+    subject, body = render_confirmation_email(code, action)
+    return enqueue_email(db, email, subject, body)
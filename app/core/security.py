@@ -1,12 +1,111 @@
+from concurrent.futures import ThreadPoolExecutor
 from passlib.context import CryptContext
+from passlib.hash import bcrypt
 from jose import jwt
+from fastapi import HTTPException
 import datetime
+import asyncio
+import time
 
 from app.core.config import settings
+from app.db.enums import UserTypeEnum
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
+def calibrate_bcrypt_rounds(target_ms: int, min_rounds: int, max_rounds: int) -> int:
+    """Pick the highest bcrypt cost whose hash still fits into `target_ms` on this machine."""
+    rounds = min_rounds
+    for candidate in range(min_rounds, max_rounds + 1):
+        started_at = time.perf_counter()
+        bcrypt.using(rounds=candidate).hash("calibration password")
+        if (time.perf_counter() - started_at) * 1000 > target_ms:
+            break
+        rounds = candidate
+    return rounds
+
+
+def configure_password_hashing() -> int:
+    """
+    Set the bcrypt cost used for new hashes: BCRYPT_ROUNDS if configured, otherwise the calibrated one.
+    Hashes more than one round away from it are reported by `needs_update` and rehashed on the next login;
+    the tolerance keeps workers that calibrated slightly differently from rehashing each other's hashes.
+    """
+    rounds = settings.BCRYPT_ROUNDS or calibrate_bcrypt_rounds(
+        settings.BCRYPT_TARGET_MS, settings.BCRYPT_MIN_ROUNDS, settings.BCRYPT_MAX_ROUNDS
+    )
+    pwd_context.update(
+        bcrypt__default_rounds=rounds,
+        bcrypt__min_rounds=max(bcrypt.min_rounds, rounds - 1),
+        bcrypt__max_rounds=min(bcrypt.max_rounds, rounds + 1)
+    )
+    password_hashing_pool.bcrypt_rounds = rounds
+    return rounds
+
+
+class PasswordHashingPool:
+    """
+    Runs bcrypt in a small dedicated thread pool, so hashing never blocks the event loop
+    (bcrypt releases the GIL while it works). The number of waiting calls is bounded:
+    when the queue is full new calls are rejected instead of piling up behind a login burst.
+    """
+
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hashing")
+        self.queued = 0  # submitted calls that are not finished yet
+        self.max_queued = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_wait_seconds = 0.0
+        self.total_run_seconds = 0.0
+        self.bcrypt_rounds = None  # set by configure_password_hashing
+
+    @staticmethod
+    def _timed(func, args, submitted_at: float):
+        started_at = time.perf_counter()
+        result = func(*args)
+        return result, started_at - submitted_at, time.perf_counter() - started_at
+
+    async def run(self, func, *args):
+        if self.queued >= self.max_queue:
+            self.rejected += 1
+            raise HTTPException(status_code=503, detail="Server is busy, try again later",
+                                headers={"Retry-After": "1"})
+
+        self.queued += 1
+        self.max_queued = max(self.max_queued, self.queued)
+        try:
+            loop = asyncio.get_running_loop()
+            result, wait_seconds, run_seconds = await loop.run_in_executor(
+                self.executor, self._timed, func, args, time.perf_counter()
+            )
+        finally:
+            self.queued -= 1
+
+        self.completed += 1
+        self.total_wait_seconds += wait_seconds
+        self.total_run_seconds += run_seconds
+        return result
+
+    def stats(self) -> dict:
+        return {
+            "bcrypt_rounds": self.bcrypt_rounds,
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "queued": self.queued,
+            "max_queued": self.max_queued,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_wait_ms": round(self.total_wait_seconds / self.completed * 1000, 2) if self.completed else 0.0,
+            "avg_run_ms": round(self.total_run_seconds / self.completed * 1000, 2) if self.completed else 0.0,
+        }
+
+
+password_hashing_pool = PasswordHashingPool(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_QUEUE)
+
+
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
 
@@ -19,5 +118,22 @@ def create_jwt_token(data: dict) -> str:
     return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
 
 
+def create_user_jwt_token(user_id: int, login: str, user_type: UserTypeEnum) -> str:
+    # "sub" keeps the login, so the token still works on workers that look users up by login
+    return create_jwt_token(data={"sub": login, "user_id": user_id, "user_type": user_type})
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    return pwd_context.needs_update(hashed_password)
+
+
+async def hash_password_async(password: str) -> str:
+    return await password_hashing_pool.run(hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await password_hashing_pool.run(verify_password, plain_password, hashed_password)
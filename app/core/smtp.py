@@ -0,0 +1,185 @@
+import asyncio
+import time
+from email.message import EmailMessage
+
+import aiosmtplib
+
+from app.core.config import settings
+
+
+class SMTPConnectionPool:
+    """
+    A small pool of persistent SMTP sessions. Connections are opened lazily, authenticated once and reused
+    for many messages, so a burst of emails doesn't open a new SMTP session per message.
+    A connection is recycled after `max_messages` messages or `idle_timeout` seconds without use,
+    as most servers limit both.
+    """
+
+    def __init__(
+        self,
+        hostname: str,
+        port: int,
+        username: str | None,
+        password: str | None,
+        size: int,
+        max_messages: int,
+        idle_timeout: float,
+        timeout: float
+    ):
+        self.hostname = hostname
+        self.port = port
+        self.username = username
+        self.password = password
+        self.size = size
+        self.max_messages = max_messages
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self.semaphore = asyncio.Semaphore(size)
+        self.idle: list[tuple[aiosmtplib.SMTP, int, float]] = []  # (connection, messages sent, last used)
+        self.connections_opened = 0
+        self.messages_sent = 0
+        self.messages_failed = 0
+        self.batches = 0
+        self.total_send_seconds = 0.0
+
+    async def _connect(self) -> aiosmtplib.SMTP:
+        connection = aiosmtplib.SMTP(
+            hostname=self.hostname,
+            port=self.port,
+            use_tls=False,
+            start_tls=False,
+            timeout=self.timeout
+        )
+        await connection.connect()
+        if self.username:
+            await connection.login(self.username, self.password)
+        self.connections_opened += 1
+        return connection
+
+    @staticmethod
+    async def _close(connection: aiosmtplib.SMTP) -> None:
+        try:
+            await connection.quit()
+        except Exception:
+            connection.close()
+
+    async def _acquire(self) -> tuple[aiosmtplib.SMTP, int]:
+        while self.idle:
+            connection, sent, last_used_at = self.idle.pop()
+            if connection.is_connected and time.monotonic() - last_used_at < self.idle_timeout:
+                return connection, sent
+            await self._close(connection)
+        return await self._connect(), 0
+
+    async def _release(self, connection: aiosmtplib.SMTP, sent: int) -> None:
+        if connection.is_connected and sent < self.max_messages:
+            self.idle.append((connection, sent, time.monotonic()))
+        else:
+            await self._close(connection)
+
+    async def send_batch(self, messages: list[EmailMessage]) -> list[Exception | None]:
+        """
+        Send the messages over one pooled connection. Returns one entry per message: None if it was sent,
+        otherwise the error. A dropped connection is reopened once per message; if no connection can be opened,
+        the rest of the batch fails with that error.
+        """
+        results: list[Exception | None] = []
+        async with self.semaphore:
+            started_at = time.perf_counter()
+            connection, sent = None, 0
+            for message in messages:
+                error = None
+                for _ in range(2):
+                    if connection is None or sent >= self.max_messages:
+                        if connection is not None:
+                            await self._close(connection)
+                            connection = None
+                        try:
+                            connection, sent = await self._acquire()
+                        except Exception as e:
+                            error = e
+                            break
+
+                    try:
+                        await connection.send_message(message)
+                    except aiosmtplib.SMTPServerDisconnected as e:
+                        connection, error = None, e
+                        continue
+                    except Exception as e:
+                        # the server rejected this message, the connection itself is still usable
+                        error = e
+                        if not connection.is_connected:
+                            connection = None
+                        break
+
+                    sent += 1
+                    error = None
+                    break
+
+                results.append(error)
+                if error is None:
+                    self.messages_sent += 1
+                else:
+                    self.messages_failed += 1
+                    if connection is None:
+                        break
+
+            # the server is unreachable, don't wait for a timeout per remaining message
+            for _ in messages[len(results):]:
+                results.append(results[-1])
+                self.messages_failed += 1
+
+            if connection is not None:
+                await self._release(connection, sent)
+            self.batches += 1
+            self.total_send_seconds += time.perf_counter() - started_at
+        return results
+
+    async def send(self, message: EmailMessage) -> None:
+        error, = await self.send_batch([message])
+        if error is not None:
+            raise error
+
+    async def send_many(self, messages: list[EmailMessage]) -> list[Exception | None]:
+        """Spread the messages over up to `size` connections and send the chunks concurrently."""
+        if not messages:
+            return []
+        chunks = [messages[i::self.size] for i in range(min(self.size, len(messages)))]
+        chunk_results = await asyncio.gather(*(self.send_batch(chunk) for chunk in chunks))
+
+        # put the results back into the order of `messages`
+        results: list[Exception | None] = [None] * len(messages)
+        for i, chunk_result in enumerate(chunk_results):
+            results[i::self.size] = chunk_result
+        return results
+
+    async def close(self) -> None:
+        while self.idle:
+            connection, _, _ = self.idle.pop()
+            await self._close(connection)
+
+    def stats(self) -> dict:
+        return {
+            "pool_size": self.size,
+            "idle_connections": len(self.idle),
+            "connections_opened": self.connections_opened,
+            "messages_sent": self.messages_sent,
+            "messages_failed": self.messages_failed,
+            "batches": self.batches,
+            "messages_per_connection": round(self.messages_sent / self.connections_opened, 2)
+            if self.connections_opened else 0.0,
+            "messages_per_second": round(self.messages_sent / self.total_send_seconds, 2)
+            if self.total_send_seconds else 0.0,
+        }
+
+
+smtp_pool = SMTPConnectionPool(
+    hostname=settings.MAIL_SERVER,
+    port=settings.MAIL_PORT,
+    username=settings.MAIL_USERNAME if settings.MAIL_USE_CREDENTIALS else None,
+    password=settings.MAIL_PASSWORD if settings.MAIL_USE_CREDENTIALS else None,
+    size=settings.SMTP_POOL_SIZE,
+    max_messages=settings.SMTP_POOL_MAX_MESSAGES_PER_CONNECTION,
+    idle_timeout=settings.SMTP_POOL_IDLE_SECONDS,
+    timeout=settings.SMTP_TIMEOUT_SECONDS
+)
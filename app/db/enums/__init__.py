@@ -3,3 +3,4 @@ from .emotions_enum import EmotionsEnum
 from .request_status_enum import RequestStatusEnum
 from .sex_enum import SexEnum
 from .user_type_enum import UserTypeEnum
+from .outbox_status_enum import OutboxStatusEnum
@@ -0,0 +1,7 @@
+from enum import Enum
+
+
+class OutboxStatusEnum(str, Enum):
+    PENDING = "pending"
+    SENT = "sent"
+    DEAD = "dead"  # delivery gave up after the maximum number of attempts
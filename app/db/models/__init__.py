@@ -6,3 +6,6 @@ from .confirmation_request import ConfirmationRequest
 from .psychologist_request import PsychologistRequest
 from .client_request import ClientRequest
 from .association_tables import client_psychologist
+from .email_outbox import EmailOutbox
+from .note_emotion_daily import NoteEmotionDaily
+from .note_tombstone import NoteTombstone
@@ -36,4 +36,9 @@ class Client(Base):
     __table_args__ = (
         Index("idx_clients_login", "login"),
         Index("idx_clients_email", "email"),
+        # trigram indexes for prefix and fuzzy user search
+        Index("idx_clients_login_trgm", "login", postgresql_using="gin", postgresql_ops={"login": "gin_trgm_ops"}),
+        Index("idx_clients_email_trgm", "email", postgresql_using="gin", postgresql_ops={"email": "gin_trgm_ops"}),
+        Index("idx_clients_first_name_trgm", "first_name", postgresql_using="gin", postgresql_ops={"first_name": "gin_trgm_ops"}),
+        Index("idx_clients_last_name_trgm", "last_name", postgresql_using="gin", postgresql_ops={"last_name": "gin_trgm_ops"}),
     )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, text
 from sqlalchemy.dialects.postgresql import ENUM as PgEnum
 from sqlalchemy.orm import relationship
 
@@ -25,4 +25,9 @@ class ConfirmationRequest(Base):
     __table_args__ = (
         Index("idx_confirmation_requests_client_id", "client_id"),
         Index("idx_confirmation_requests_psychologist_id", "psychologist_id"),
+        Index("idx_confirmation_requests_code", "code", unique=True),
+        # codes still waiting for confirmation, looked up when a new registration code is requested
+        Index("idx_confirmation_requests_pending", "client_id", "type",
+              postgresql_where=text('"confirmedAt" IS NULL')),
+        Index("idx_confirmation_requests_created_at", "createdAt"),
     )
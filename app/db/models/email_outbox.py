@@ -0,0 +1,29 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, Integer, String, DateTime, Index, text
+from sqlalchemy.dialects.postgresql import ENUM as PgEnum
+
+from app.db.models.base import Base
+
+from app.db.enums.outbox_status_enum import OutboxStatusEnum
+
+
+class EmailOutbox(Base):
+    __tablename__ = "email_outbox"
+
+    outbox_id = Column(Integer, primary_key=True)
+    recipient = Column(String, nullable=False)
+    subject = Column(String, nullable=False)
+    body = Column(String, nullable=False)
+    status = Column(PgEnum(OutboxStatusEnum, name="outbox_status", create_type=False), nullable=False,
+                    default=OutboxStatusEnum.PENDING)
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(String, nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+    next_attempt_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+    sent_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("idx_email_outbox_pending", "next_attempt_at", postgresql_where=text("status = 'PENDING'")),
+        Index("idx_email_outbox_status", "status"),
+    )
@@ -1,13 +1,17 @@
 from datetime import datetime, timezone
 
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, ARRAY, Index
-from sqlalchemy.orm import relationship
-from sqlalchemy.dialects.postgresql import ENUM as PgEnum
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, ARRAY, Index, LargeBinary, REAL, Computed
+from sqlalchemy.orm import relationship, deferred
+from sqlalchemy.dialects.postgresql import ENUM as PgEnum, TSVECTOR
 
 from app.db.models.base import Base
 
 from app.db.enums.emotions_enum import EmotionsEnum
 
+# The russian configuration stems Cyrillic words with the Russian stemmer and Latin words with the English one,
+# so a single configuration covers notes written in either language
+NOTE_SEARCH_CONFIG = "russian"
+
 
 class Note(Base):
     __tablename__ = "notes"
@@ -18,11 +22,35 @@ class Note(Base):
     createdAt = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
     updatedAt = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
     emotions = Column(ARRAY(PgEnum(EmotionsEnum, name="emotions", create_type=False)), nullable=True)
+    # full softmax of the model, ordered as EmotionsEnum, so statistics never need to re-run the model
+    emotion_probabilities = Column(ARRAY(REAL, dimensions=1), nullable=True)
+    model_version = Column(String, nullable=True)  # version of the model that predicted emotions, NULL if set manually
+    embedding = Column(LargeBinary, nullable=True)  # unit-length float16 pooled hidden state of the model
     client_id = Column(Integer, ForeignKey("clients.client_id", ondelete="CASCADE"), nullable=False)
+    # maintained by Postgres, title lexemes weigh more than body ones when ranking
+    search_vector = deferred(Column(
+        TSVECTOR,
+        Computed(
+            f"setweight(to_tsvector('{NOTE_SEARCH_CONFIG}', title), 'A') || "
+            f"setweight(to_tsvector('{NOTE_SEARCH_CONFIG}', coalesce(body, '')), 'B')",
+            persisted=True
+        )
+    ))
 
     client = relationship("Client", back_populates="notes")
 
     __table_args__ = (
-        Index("idx_notes_client_id", "client_id"),
         Index("idx_notes_createdAt", "createdAt"),
+        Index("idx_notes_model_version", "model_version"),
+        Index("idx_notes_search_vector", "search_vector", postgresql_using="gin"),
+        # btree_gin lets client_id share the GIN index, so an emotion filter never leaves the client's notes
+        Index("idx_notes_client_emotions", "client_id", "emotions", postgresql_using="gin"),
     )
+
+
+# Composite indexes matching the note list queries: one client's notes, ordered as the keyset pagination orders them.
+# They also serve every plain client_id lookup, so there is no separate client_id index.
+Index("idx_notes_client_created", Note.client_id, Note.createdAt.desc(), Note.note_id.desc())
+Index("idx_notes_client_title", Note.client_id, Note.title, Note.note_id)
+# changes of one client's notes in the order the sync API reads them
+Index("idx_notes_client_updated", Note.client_id, Note.updatedAt, Note.note_id)
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, Date, ForeignKey
+from sqlalchemy.dialects.postgresql import ENUM as PgEnum
+
+from app.db.models.base import Base
+
+from app.db.enums.emotions_enum import EmotionsEnum
+
+
+class NoteEmotionDaily(Base):
+    """
+    Number of a client's notes with an emotion per day (UTC day of the note's createdAt).
+    Maintained by the notes_emotion_rollup trigger on every insert, emotion change and delete of a note,
+    the application only reads it.
+    """
+    __tablename__ = "note_emotion_daily"
+
+    client_id = Column(Integer, ForeignKey("clients.client_id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    emotion = Column(PgEnum(EmotionsEnum, name="emotions", create_type=False), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,19 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Index
+
+from app.db.models.base import Base
+
+
+class NoteTombstone(Base):
+    """Marker of a deleted note, so synchronizing clients learn about the deletion."""
+    __tablename__ = "note_tombstones"
+
+    note_id = Column(Integer, primary_key=True)  # id of the deleted note, the note row itself is gone
+    client_id = Column(Integer, ForeignKey("clients.client_id", ondelete="CASCADE"), nullable=False)
+    deletedAt = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+
+    __table_args__ = (
+        Index("idx_note_tombstones_client_deleted", "client_id", "deletedAt", "note_id"),
+        Index("idx_note_tombstones_deleted", "deletedAt"),  # retention purge
+    )
@@ -35,4 +35,9 @@ class Psychologist(Base):
     __table_args__ = (
         Index("idx_psychologists_login", "login"),
         Index("idx_psychologists_email", "email"),
+        # trigram indexes for prefix and fuzzy user search
+        Index("idx_psychologists_login_trgm", "login", postgresql_using="gin", postgresql_ops={"login": "gin_trgm_ops"}),
+        Index("idx_psychologists_email_trgm", "email", postgresql_using="gin", postgresql_ops={"email": "gin_trgm_ops"}),
+        Index("idx_psychologists_first_name_trgm", "first_name", postgresql_using="gin", postgresql_ops={"first_name": "gin_trgm_ops"}),
+        Index("idx_psychologists_last_name_trgm", "last_name", postgresql_using="gin", postgresql_ops={"last_name": "gin_trgm_ops"}),
     )
@@ -0,0 +1,134 @@
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Optional, Sequence
+
+from fastapi import HTTPException
+from sqlalchemy import Select, func, literal_column, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+
+
+@dataclass
+class Page:
+    items: list
+    total: int
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+
+
+def encode_cursor(values: Sequence[Any], backward: bool = False) -> str:
+    payload = {
+        "v": [value.isoformat() if isinstance(value, datetime) else value for value in values],
+        "b": backward
+    }
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, keys: Sequence[InstrumentedAttribute]) -> tuple[list, bool]:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        values, backward = payload["v"], bool(payload["b"])
+        if len(values) != len(keys):
+            raise ValueError("cursor does not match the sort key")
+        values = [
+            datetime.fromisoformat(value) if key.type.python_type is datetime else value
+            for key, value in zip(keys, values)
+        ]
+    except (binascii.Error, UnicodeDecodeError, ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values, backward
+
+
+def estimated_count(table_name: str):
+    """
+    Row count of a whole table taken from the planner statistics instead of counting the rows.
+    Tables that were never analyzed have no estimate yet (reltuples is -1), they are counted.
+    `table_name` is interpolated into SQL and must come from a model, never from a request.
+    """
+    return literal_column(
+        f"(SELECT CASE WHEN c.reltuples >= 0 THEN c.reltuples::bigint "
+        f"ELSE (SELECT count(*) FROM {table_name}) END "
+        f"FROM pg_class c WHERE c.oid = '{table_name}'::regclass)"
+    )
+
+
+async def paginate(
+    db: AsyncSession,
+    stmt: Select,
+    keys: Sequence[InstrumentedAttribute],
+    size: int,
+    page: int = 1,
+    cursor: Optional[str] = None,
+    descending: bool = False,
+    estimate_table: Optional[str] = None
+) -> Page:
+    """
+    Run `stmt` ordered by `keys`, which must identify a row uniquely and should be backed by an index.
+    Without a cursor the `page`-th page is returned (OFFSET mode, kept for compatibility); with a cursor
+    the page right after or before the cursor's row is read straight from the index (keyset mode),
+    so deep pages cost the same as the first one. Both modes return cursors of the neighbouring pages.
+    A statement selecting one entity yields entities; a column projection yields its rows, which then
+    also carry the `total` column. Either way the selected items must carry the key attributes.
+
+    The total comes back in the same statement as the page: an exact count of `stmt`,
+    or the planner's estimate of `estimate_table` for unfiltered lists of large tables.
+    """
+    if estimate_table is not None:
+        total_column = estimated_count(estimate_table)
+    else:
+        # an uncorrelated subquery is computed once per statement; a count(*) OVER () would only count
+        # the rows past the cursor in keyset mode and would keep the LIMIT from stopping the scan early
+        total_column = (
+            stmt.with_only_columns(func.count(), maintain_column_froms=True)
+            .scalar_subquery()
+            .correlate(None)
+        )
+
+    selected = stmt.column_descriptions
+    single_entity = len(selected) == 1 and selected[0]["expr"] is selected[0]["entity"]
+
+    backward = False
+    if cursor is not None:
+        values, backward = decode_cursor(cursor, keys)
+        # reading backwards is reading forwards in the opposite order
+        if descending != backward:
+            stmt = stmt.where(tuple_(*keys) < tuple_(*values))
+        else:
+            stmt = stmt.where(tuple_(*keys) > tuple_(*values))
+    else:
+        stmt = stmt.offset((page - 1) * size)
+
+    reverse = descending != backward
+    stmt = (
+        stmt.add_columns(total_column.label("total"))
+        .order_by(*(key.desc() if reverse else key.asc() for key in keys))
+        .limit(size + 1)
+    )
+    result = await db.execute(stmt)
+    rows = result.all()
+
+    if not rows:
+        # past the last page there is no row to carry the total
+        return Page(items=[], total=await db.scalar(select(total_column)))
+
+    total = rows[0].total
+    has_more = len(rows) > size
+    items = [row[0] if single_entity else row for row in rows[:size]]
+    if backward:
+        items.reverse()
+
+    def key_of(item) -> list:
+        return [getattr(item, key.key) for key in keys]
+
+    # coming back from a later page means there is a next one, coming from an earlier page means there is a previous one
+    has_next = has_more if not backward else True
+    has_prev = (has_more if backward else True) if cursor is not None else page > 1
+    return Page(
+        items=items,
+        total=total,
+        next_cursor=encode_cursor(key_of(items[-1])) if has_next else None,
+        prev_cursor=encode_cursor(key_of(items[0]), backward=True) if has_prev else None
+    )
@@ -0,0 +1,34 @@
+from typing import Sequence
+
+from sqlalchemy import Select, func, or_, select
+
+USER_SEARCH_MODES = ("prefix", "fuzzy")
+USER_SEARCH_COLUMNS = ("login", "email", "first_name", "last_name")
+
+
+def escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def user_search_query(
+    model,
+    query: str,
+    mode: str = "prefix",
+    columns: Sequence[str] = USER_SEARCH_COLUMNS
+) -> Select:
+    """
+    Search users of `model` (Client or Psychologist) by `columns`: login, email, first and last name by default.
+    `prefix` matches values starting with the query, `fuzzy` matches values similar to it despite typos.
+    Both are served by the pg_trgm GIN indexes of the columns, queries need at least 3 characters to use them.
+    Results are ranked by the best trigram similarity of any of the columns.
+    """
+    columns = [getattr(model, column) for column in columns]
+
+    if mode == "fuzzy":
+        condition = or_(*(column.bool_op("%")(query) for column in columns))
+    else:
+        pattern = escape_like(query) + "%"
+        condition = or_(*(column.ilike(pattern, escape="\\") for column in columns))
+
+    score = func.greatest(*(func.similarity(column, query) for column in columns))
+    return select(model).where(condition).order_by(score.desc(), model.client_id)
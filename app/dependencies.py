@@ -3,16 +3,58 @@ from fastapi.security import OAuth2PasswordBearer
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy import inspect
 
 from jose import JWTError, jwt
 
 from app.core.config import settings
+from app.core.cache import TTLCache
 from app.db.models import Client, Psychologist, Admin
 from app.db.session import get_db
 from app.db.enums.user_type_enum import UserTypeEnum
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="app/v1/user/login", scheme_name="UserLogin")
 
+USER_MODELS = {
+    UserTypeEnum.CLIENT: Client,
+    UserTypeEnum.PSYCHOLOGIST: Psychologist,
+}
+
+# (user type, "id" or "login", value) -> (model class, column values) of authenticated users,
+# the password hash is never cached
+principal_cache = TTLCache(settings.PRINCIPAL_CACHE_SIZE, settings.PRINCIPAL_CACHE_TTL_SECONDS)
+
+
+def _cache_principal(user_type: UserTypeEnum, user: Client | Psychologist) -> None:
+    values = {
+        attr.key: getattr(user, attr.key)
+        for attr in inspect(type(user)).column_attrs
+        if attr.key != "password"
+    }
+    principal_cache.set((user_type, "id", user.client_id), (type(user), values))
+    principal_cache.set((user_type, "login", user.login), (type(user), values))
+
+
+def _cached_principal(key: tuple) -> Client | Psychologist | None:
+    entry = principal_cache.get(key)
+    if entry is None:
+        return None
+
+    # a fresh transient instance per request, so a request can never change what another one sees
+    model, values = entry
+    return model(**values)
+
+
+def invalidate_principal(user_type: UserTypeEnum, user: Client | Psychologist) -> None:
+    """Must be called whenever a user's profile, credentials, verification or role changes."""
+    principal_cache.invalidate((user_type, "id", user.client_id))
+    principal_cache.invalidate((user_type, "login", user.login))
+
+
+async def get_user_by_id(db: AsyncSession, user_type: UserTypeEnum, user_id: int) -> Client | Psychologist | None:
+    """Primary key lookup of a client or a psychologist, served from the session identity map when possible."""
+    return await db.get(USER_MODELS[user_type], user_id)
+
 
 async def get_current_user(token: str = Depends(oauth2_scheme),
                            db: AsyncSession = Depends(get_db)) -> Client | Psychologist:
@@ -25,24 +67,32 @@ async def get_current_user(token: str = Depends(oauth2_scheme),
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         login: str = payload.get("sub")
+        user_id: int = payload.get("user_id")
         user_type: str = payload.get("user_type")
-        if login is None or user_type is None:
+        if (login is None and user_id is None) or user_type is None:
             raise credentials_exception
-    except JWTError as e:
+        user_type = UserTypeEnum(user_type)
+    except (JWTError, ValueError) as e:
         raise credentials_exception
 
-    if user_type == UserTypeEnum.CLIENT:
-        stmt = select(Client).where(Client.login == login)
-        result = await db.execute(stmt)
-        user = result.scalar_one_or_none()
+    # tokens issued before ids were added to them only carry the login
+    key = (user_type, "id", user_id) if user_id is not None else (user_type, "login", login)
+    user = _cached_principal(key)
+    if user is not None:
+        return user
+
+    if user_id is not None:
+        user = await get_user_by_id(db, user_type, user_id)
     else:
-        stmt = select(Psychologist).where(Psychologist.login == login)
+        model = USER_MODELS[user_type]
+        stmt = select(model).where(model.login == login)
         result = await db.execute(stmt)
         user = result.scalar_one_or_none()
 
     if user is None:
         raise credentials_exception
 
+    _cache_principal(user_type, user)
     return user
 
 
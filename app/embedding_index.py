@@ -0,0 +1,82 @@
+import numpy as np
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.db.models import Note
+
+
+class ClientEmbeddingIndex:
+    """
+    Per-client in-memory index of note embeddings. Every client's embeddings are kept as one float16 matrix,
+    so a similarity search is a single matrix-vector product instead of a scan over the notes.
+    Indexes are built lazily from the database and dropped whenever one of the client's notes changes.
+    An index holds the embeddings of one model version only, as vectors of different models are not comparable;
+    the cached version is the one of the last searched note, it is rebuilt when a note of another version is searched.
+    """
+
+    def __init__(self, max_clients: int, ttl: float):
+        self.cache = TTLCache(max_clients, ttl)
+
+    async def _load(self, client_id: int, model_version: str, db: AsyncSession) -> tuple[np.ndarray, np.ndarray]:
+        stmt = (
+            select(Note.note_id, Note.embedding)
+            .where(
+                Note.client_id == client_id,
+                Note.model_version == model_version,
+                Note.embedding.isnot(None)
+            )
+            .order_by(Note.note_id)
+        )
+        result = await db.execute(stmt)
+        rows = result.all()
+
+        note_ids = np.array([note_id for note_id, _ in rows], dtype=np.int64)
+        if not rows:
+            return note_ids, np.empty((0, 0), dtype=np.float16)
+
+        matrix = np.frombuffer(b"".join(embedding for _, embedding in rows), dtype=np.float16)
+        return note_ids, matrix.reshape(len(rows), -1)
+
+    async def get(self, client_id: int, model_version: str, db: AsyncSession) -> tuple[np.ndarray, np.ndarray]:
+        entry = self.cache.get(client_id)
+        if entry is None or entry[0] != model_version:
+            entry = (model_version, *await self._load(client_id, model_version, db))
+            self.cache.set(client_id, entry)
+        return entry[1], entry[2]
+
+    def invalidate(self, client_id: int) -> None:
+        self.cache.invalidate(client_id)
+
+    async def search(
+        self,
+        client_id: int,
+        model_version: str,
+        embedding: bytes,
+        db: AsyncSession,
+        limit: int = 5,
+        exclude_note_id: int | None = None
+    ) -> list[tuple[int, float]]:
+        """
+        Returns up to `limit` (note_id, cosine similarity) pairs, the most similar notes first.
+        Only notes analyzed by `model_version`, the version that produced `embedding`, are compared.
+        """
+        note_ids, matrix = await self.get(client_id, model_version, db)
+        query = np.frombuffer(embedding, dtype=np.float16).astype(np.float32)
+        if not len(note_ids) or matrix.shape[1] != query.shape[0]:
+            return []
+
+        scores = matrix.astype(np.float32) @ query
+        if exclude_note_id is not None:
+            scores[note_ids == exclude_note_id] = -np.inf
+
+        limit = min(limit, len(note_ids))
+        top = np.argpartition(-scores, limit - 1)[:limit]
+        top = top[np.argsort(-scores[top])]
+
+        return [(int(note_ids[i]), float(scores[i])) for i in top if np.isfinite(scores[i])]
+
+
+embedding_index = ClientEmbeddingIndex(settings.EMBEDDING_INDEX_MAX_CLIENTS, settings.EMBEDDING_INDEX_TTL_SECONDS)
@@ -1,11 +1,19 @@
 import os
+import asyncio
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.core.config import settings
-from app.ml_service import ThreadSafeModelHandler
+from app.core.security import configure_password_hashing
+from app.core.smtp import smtp_pool
+from app.ml_service import ThreadSafeModelHandler, ModelRegistry, watch_model_registry
+from app.workers.analysis_queue import note_analysis_queue
+from app.workers.email_outbox import run_email_outbox_worker, run_email_outbox_purge_worker
+from app.workers.confirmation_purge import run_confirmation_purge_worker
+from app.workers.tombstone_purge import run_tombstone_purge_worker
 from app.api.v1.auth_routes import router as api_router
 from app.api.v1.user_routes import router as user_router
 from app.api.v1.admin_routes import router as admin_router
@@ -25,9 +33,46 @@ def ensure_directories():
 ensure_directories()
 
 
-app = FastAPI(title="Mental Platform")
-model_handler = ThreadSafeModelHandler(settings.MODEL_PATH)
+def create_model_handler(registry: ModelRegistry | None) -> ThreadSafeModelHandler:
+    # The registry's active version wins, MODEL_PATH stays the fallback for deployments without a registry
+    version = registry.get_active_version() if registry else None
+    if version:
+        return ThreadSafeModelHandler(registry.get_artifact_path(version), version)
+    return ThreadSafeModelHandler(settings.MODEL_PATH, settings.MODEL_VERSION)
+
+
+model_registry = ModelRegistry(settings.MODEL_REGISTRY_DIRECTORY) if settings.MODEL_REGISTRY_DIRECTORY else None
+model_handler = create_model_handler(model_registry)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await asyncio.to_thread(configure_password_hashing)
+
+    background_tasks = [
+        asyncio.create_task(run_email_outbox_worker()),
+        asyncio.create_task(run_email_outbox_purge_worker()),
+        asyncio.create_task(run_confirmation_purge_worker()),
+        asyncio.create_task(run_tombstone_purge_worker()),
+    ]
+    if model_registry:
+        background_tasks.append(asyncio.create_task(
+            watch_model_registry(model_handler, model_registry, settings.MODEL_REGISTRY_POLL_SECONDS)
+        ))
+    if settings.AUTO_ANALYZE_NOTES:
+        background_tasks.append(asyncio.create_task(note_analysis_queue.run(model_handler)))
+
+    yield
+
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    await smtp_pool.close()
+
+
+app = FastAPI(title="Mental Platform", lifespan=lifespan)
 app.dependency_overrides[ThreadSafeModelHandler] = lambda: model_handler
+app.dependency_overrides[ModelRegistry] = lambda: model_registry
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:5173"],  # TODO: take this out
@@ -1,4 +1,8 @@
+import os
 import re
+import json
+import asyncio
+import logging
 import threading
 from abc import ABC, abstractmethod
 import torch
@@ -6,7 +10,12 @@ from transformers import RobertaTokenizer, RobertaForSequenceClassification
 from googletrans import Translator
 from threading import Lock
 from app.db.enums import EmotionsEnum
-from typing import Dict, List
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Analysis results stored on a note, the keys match the Note columns
+ANALYSIS_FIELDS = ("emotions", "emotion_probabilities", "embedding", "model_version")
 
 
 class AbstractModel(ABC):
@@ -69,8 +78,9 @@ class RoBertaModel:
         "surprised": EmotionsEnum.SURPRISED
     }
 
-    def __init__(self, model_path: str):
+    def __init__(self, model_path: str, model_version: str = "default"):
         self.model_path = model_path
+        self.model_version = model_version
         self.model = RobertaForSequenceClassification.from_pretrained('roberta-base', num_labels=len(self.emotions))
         self.model.load_state_dict(torch.load(model_path, map_location=torch.device('cpu')))
         self.model.eval()
@@ -81,42 +91,245 @@ class RoBertaModel:
     def _validation(self, text: str) -> bool:
         return bool(re.match(r'^[a-zA-Z0-9\s.,!?\'\"]+$', text))
 
-    def _preprocessing(self, text: str) -> Dict:
+    def _translate(self, text: str) -> str:
         with self.lock:
             if not self._validation(text):
                 translation = self.translator.translate(text, dest='en')
-                translated = translation.text
-            else:
-                translated = text
-        
+                return translation.text
+        return text
+
+    def _translate_many(self, texts: List[str]) -> List[str]:
+        # One translation request for all the texts; the line structure survives translation in practice,
+        # if it does not the texts are translated one by one
+        if all(self._validation(text) for text in texts):
+            return texts
+
+        translated = self._translate("\n".join(texts)).split("\n")
+        if len(translated) != len(texts):
+            translated = [self._translate(text) for text in texts]
+        return translated
+
+    def _preprocessing(self, text: str | List[str]) -> Dict:
+        translated = self._translate(text) if isinstance(text, str) else self._translate_many(text)
+
         inputs = self.tokenizer(translated, return_tensors="pt", padding=True, truncation=True, max_length=512)
         return inputs
 
-    def predict(self, text: str) -> List[str]:
+    def _forward(self, text: str | List[str]) -> tuple[torch.Tensor, torch.Tensor]:
+        """
+        Runs one forward pass over the text (or the batch of texts). Returns a row of probabilities and
+        the pooled hidden state (the <s> token the classification head reads) per text.
+        """
         inputs = self._preprocessing(text)
         with torch.no_grad():
-            outputs = self.model(**inputs)
-            probabilities = torch.softmax(outputs.logits, dim=-1).cpu().numpy()
+            # the same steps as RobertaForSequenceClassification.forward, keeping the hidden state on the way
+            sequence_output = self.model.roberta(**inputs)[0]
+            logits = self.model.classifier(sequence_output)
+            probabilities = torch.softmax(logits, dim=-1).cpu()
+            embeddings = sequence_output[:, 0, :].cpu()
+        return probabilities, embeddings
 
-        emotion_probabilities = {self.emotions[i]: prob * 100 for i, prob in enumerate(probabilities[0])}
-        top_3_emotions = sorted(emotion_probabilities.items(), key=lambda item: item[1], reverse=True)[:3]
-        
-        result = [self.emotion_to_enum_mapping[emotion] for emotion, _ in top_3_emotions]
-        return result
+    @staticmethod
+    def _to_embedding(vector: torch.Tensor) -> bytes:
+        """Unit-length float16 bytes, so the cosine similarity of two notes is a plain dot product."""
+        vector = torch.nn.functional.normalize(vector, dim=0)
+        return vector.to(torch.float16).numpy().tobytes()
+
+    def _top_emotions(self, probabilities: torch.Tensor, k: int = 3) -> List[EmotionsEnum]:
+        top_indices = torch.topk(probabilities, k).indices.tolist()
+        return [self.emotion_to_enum_mapping[self.emotions[i]] for i in top_indices]
+
+    @staticmethod
+    def _split_sentences(text: str) -> List[Dict]:
+        sentences = []
+        for match in re.finditer(r'[^.!?…\n]+[.!?…]*', text):
+            sentence = match.group().strip()
+            if any(char.isalnum() for char in sentence):
+                start = match.start() + match.group().index(sentence)
+                sentences.append({"text": sentence, "start": start, "end": start + len(sentence)})
+        return sentences
+
+    def predict(self, text: str) -> List[str]:
+        return self.analyze_text(text)["emotions"]
+
+    def analyze_text(self, text: str) -> Dict:
+        probabilities, embeddings = self._forward(text)
+        return {
+            "emotions": self._top_emotions(probabilities[0]),
+            "emotion_probabilities": probabilities[0].tolist(),
+            "embedding": self._to_embedding(embeddings[0])
+        }
+
+    def predict_sentences(self, text: str) -> Dict:
+        """
+        Predicts the top 3 emotions of every sentence with a single batched forward pass.
+        The note-level emotions are the sentence ones averaged with the sentence lengths as weights.
+        The whole note goes first in the same batch and gives the embedding, as in `analyze_text`:
+        a mean of sentence states lives in another space than the whole-note embeddings similarity search compares.
+        """
+        sentences = self._split_sentences(text) or [{"text": text.strip(), "start": 0, "end": len(text)}]
+
+        # line breaks are flattened, the batch is translated as one text with a line per entry
+        note_text = " ".join(text.split())
+        probabilities, embeddings = self._forward([note_text] + [sentence["text"] for sentence in sentences])
+        note_embedding, probabilities = embeddings[0], probabilities[1:]
+
+        weights = torch.tensor([len(sentence["text"]) for sentence in sentences], dtype=probabilities.dtype)
+        weights = (weights / weights.sum()).unsqueeze(1)
+        aggregate = (probabilities * weights).sum(dim=0)
+
+        for sentence, sentence_probabilities in zip(sentences, probabilities):
+            sentence["emotions"] = self._top_emotions(sentence_probabilities)
+
+        return {
+            "emotions": self._top_emotions(aggregate),
+            "emotion_probabilities": aggregate.tolist(),
+            "embedding": self._to_embedding(note_embedding),
+            "sentences": sentences
+        }
+
+
+class ModelRegistry:
+    """
+    Directory of versioned model artifacts. Every version is a sub-directory with the weights and their metadata:
+        <root>/<version>/model.pt
+        <root>/<version>/metadata.json
+    The version that should serve traffic is written into <root>/active, so every worker can pick it up.
+    """
+    ARTIFACT_NAME = "model.pt"
+    METADATA_NAME = "metadata.json"
+    ACTIVE_NAME = "active"
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def _version_dir(self, version: str) -> str:
+        if not re.match(r'^[A-Za-z0-9][A-Za-z0-9._-]*$', version):
+            raise ValueError(f"Invalid model version '{version}'")
+        return os.path.join(self.root, version)
+
+    def list_versions(self) -> List[Dict]:
+        if not os.path.isdir(self.root):
+            return []
+
+        versions = []
+        for name in sorted(os.listdir(self.root)):
+            if os.path.isfile(os.path.join(self.root, name, self.ARTIFACT_NAME)):
+                versions.append(self.get_metadata(name))
+        return versions
+
+    def get_metadata(self, version: str) -> Dict:
+        """A malformed metadata.json doesn't hide the version, its error is reported in `metadata_error`."""
+        metadata = {}
+        metadata_path = os.path.join(self._version_dir(version), self.METADATA_NAME)
+        if os.path.isfile(metadata_path):
+            try:
+                with open(metadata_path, encoding="utf-8") as file:
+                    metadata = json.load(file)
+                if not isinstance(metadata, dict):
+                    raise ValueError("metadata must be a JSON object")
+            except (OSError, ValueError) as e:  # json.JSONDecodeError is a ValueError
+                logger.warning("Invalid metadata of model version %s: %s", version, e)
+                metadata = {"metadata_error": str(e)}
+        metadata["version"] = version
+        return metadata
+
+    def get_artifact_path(self, version: str) -> str:
+        artifact_path = os.path.join(self._version_dir(version), self.ARTIFACT_NAME)
+        if not os.path.isfile(artifact_path):
+            raise ValueError(f"Model version '{version}' not found")
+        return artifact_path
+
+    def get_active_version(self) -> Optional[str]:
+        """Returns the version from the active pointer, or the latest one if the pointer was never written."""
+        active_path = os.path.join(self.root, self.ACTIVE_NAME)
+        if os.path.isfile(active_path):
+            with open(active_path, encoding="utf-8") as file:
+                version = file.read().strip()
+            if version:
+                return version
+
+        versions = self.list_versions()
+        return versions[-1]["version"] if versions else None
+
+    def set_active_version(self, version: str) -> None:
+        self.get_artifact_path(version)  # make sure the version exists before pointing at it
+
+        # write and rename so other workers never read a half-written pointer
+        tmp_path = os.path.join(self.root, f".{self.ACTIVE_NAME}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            file.write(version)
+        os.replace(tmp_path, os.path.join(self.root, self.ACTIVE_NAME))
 
 
 class ThreadSafeModelHandler:
-    """This class ensures a separate RoBertaModel instance per thread to avoid thread-safety issues."""
-    
-    def __init__(self, model_path: str):
-        self.model_path = model_path
+    """
+    This class ensures a separate RoBertaModel instance per thread to avoid thread-safety issues.
+
+    The served model can be swapped at runtime with `swap`: the new version is loaded and warmed up first and
+    only then published, so requests keep being answered by the previous version while the new one loads.
+    After a swap every thread serves the one warmed instance instead of loading its own copy inside a request:
+    inference only reads the weights and the translator is guarded by the model's lock.
+    """
+    WARMUP_TEXT = "I am feeling fine today."
+
+    def __init__(self, model_path: str, model_version: str = "default"):
+        # (version, path, warmed model) is replaced as a whole, so readers never see a version paired with
+        # another path; the model is None until the first swap, threads load their own instance until then
+        self.active = (model_version, model_path, None)
         self.local = threading.local()
+        self.swap_lock = Lock()
 
-    def get_model(self):
-        if not hasattr(self.local, "model"):
-            self.local.model = RoBertaModel(self.model_path)
-        return self.local.model
+    @property
+    def model_version(self) -> str:
+        return self.active[0]
+
+    @property
+    def model_path(self) -> str:
+        return self.active[1]
+
+    def get_model(self) -> RoBertaModel:
+        model_version, model_path, warmed_model = self.active
+        model = getattr(self.local, "model", None)
+        if model is None or model.model_version != model_version:
+            model = warmed_model or RoBertaModel(model_path, model_version)
+            self.local.model = model
+        return model
 
     def predict(self, text: str) -> list[str]:
         model = self.get_model()
         return model.predict(text)
+
+    def analyze(self, text: str, detailed: bool = False) -> Dict:
+        """
+        Same as predict, but also returns the note embedding and which model version produced the result.
+        With `detailed` the result also contains the emotions of every sentence.
+        """
+        model = self.get_model()
+        result = model.predict_sentences(text) if detailed else model.analyze_text(text)
+        result["model_version"] = model.model_version
+        return result
+
+    def swap(self, model_path: str, model_version: str) -> None:
+        """Load, warm up and activate another model version. This call is blocking, run it in a thread."""
+        with self.swap_lock:
+            if model_version == self.model_version:
+                return
+
+            model = RoBertaModel(model_path, model_version)
+            model.predict(self.WARMUP_TEXT)
+
+            self.active = (model_version, model_path, model)
+
+
+async def watch_model_registry(model_handler: ThreadSafeModelHandler, registry: ModelRegistry, interval: int):
+    """Periodically follows the registry's active pointer, so a swap triggered on one worker reaches all of them."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            version = registry.get_active_version()
+            if version and version != model_handler.model_version:
+                await asyncio.to_thread(model_handler.swap, registry.get_artifact_path(version), version)
+                logger.info("Switched to model version %s", version)
+        except Exception:
+            logger.exception("Failed to follow the model registry")
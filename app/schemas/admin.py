@@ -1,7 +1,7 @@
 from pydantic import BaseModel, Field
 from datetime import datetime
-from app.db.enums import SexEnum, RequestStatusEnum
-from typing import Optional, List, TypeVar, Generic
+from app.db.enums import SexEnum, RequestStatusEnum, OutboxStatusEnum
+from typing import Optional, List, TypeVar, Generic, Dict, Any
 
 
 class UserBase(BaseModel):
@@ -42,13 +42,21 @@ T = TypeVar("T")
 class PaginatedResponse(BaseModel, Generic[T]):
     items: List[T] = Field(..., description="List of items")
     total: int = Field(..., description="Total number of items")
-    page: int = Field(..., description="Current page number")
+    total_is_estimate: bool = Field(False, description="Whether total is the planner's estimate rather than an exact count")
+    page: Optional[int] = Field(None, description="Current page number, only set when paging by page number")
     size: int = Field(..., description="Number of items per page")
+    next_cursor: Optional[str] = Field(None, description="Cursor of the next page, absent on the last page")
+    prev_cursor: Optional[str] = Field(None, description="Cursor of the previous page, absent on the first page")
 
     class Config:
         from_attributes = True
 
 
+class UserSearchResponse(BaseModel, Generic[T]):
+    query: str = Field(..., description="The search query")
+    items: List[T] = Field(..., description="Matching users, the best matches first")
+
+
 class ClientRequestResponse(BaseModel):
     request_id: int
     client_id: int
@@ -65,3 +73,40 @@ class AdminCreate(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class ModelVersionResponse(BaseModel):
+    version: str
+    created_at: Optional[str] = None
+    description: Optional[str] = None
+    metadata: Dict[str, Any] = Field(default_factory=dict, description="Raw metadata.json of the version")
+
+
+class ModelRegistryResponse(BaseModel):
+    active_version: str
+    versions: List[ModelVersionResponse]
+
+
+class StaleNotesResponse(BaseModel):
+    active_version: str
+    total: int = Field(..., description="Number of notes analyzed by another model version")
+    by_version: Dict[str, int] = Field(..., description="Number of stale notes per model version")
+
+
+class RecomputeNotesResponse(BaseModel):
+    active_version: str
+    processed: int = Field(..., description="Number of notes re-analyzed in this call")
+    failed: int = Field(0, description="Number of notes whose analysis failed in this call")
+    remaining: int = Field(..., description="Number of stale notes left")
+
+
+class EmailOutboxResponse(BaseModel):
+    outbox_id: int
+    recipient: str
+    subject: str
+    status: OutboxStatusEnum
+    attempts: int
+    last_error: Optional[str] = None
+    created_at: datetime
+    next_attempt_at: datetime
+    sent_at: Optional[datetime] = None
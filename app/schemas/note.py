@@ -1,6 +1,6 @@
-from typing import Optional, List
+from typing import Annotated, Dict, Literal, Optional, List, Union
 from pydantic import BaseModel, Field
-from datetime import datetime
+from datetime import date, datetime
 
 from app.db.enums import EmotionsEnum
 
@@ -30,6 +30,43 @@ class NoteUpdate(BaseModel):
         from_attributes = True
 
 
+class NoteBatchCreate(BaseModel):
+    op: Literal["create"] = Field(..., description="Create a note")
+    data: NoteCreate
+
+
+class NoteBatchUpdate(BaseModel):
+    op: Literal["update"] = Field(..., description="Update a note")
+    note_id: int = Field(..., description="ID of the note to update")
+    data: NoteUpdate
+
+
+class NoteBatchDelete(BaseModel):
+    op: Literal["delete"] = Field(..., description="Delete a note")
+    note_id: int = Field(..., description="ID of the note to delete")
+
+
+NoteBatchOperation = Annotated[Union[NoteBatchCreate, NoteBatchUpdate, NoteBatchDelete], Field(discriminator="op")]
+
+
+class NoteBatchRequest(BaseModel):
+    operations: List[NoteBatchOperation] = Field(..., min_length=1, max_length=500,
+                                                 description="Operations, executed in one transaction")
+
+
+class NoteBatchResult(BaseModel):
+    index: int = Field(..., description="Position of the operation in the request")
+    op: str = Field(..., description="Operation on the note")
+    status: int = Field(..., description="HTTP status the operation would have had on its own")
+    note_id: Optional[int] = Field(None, description="ID of the note")
+    note: Optional[NoteResponse] = Field(None, description="The note after a create or update")
+    detail: Optional[str] = Field(None, description="Why the operation failed")
+
+
+class NoteBatchResponse(BaseModel):
+    results: List[NoteBatchResult]
+
+
 class NoteListResponse(BaseModel):
     note_id: int = Field(..., description="ID of the note")
     title: str = Field(..., description="Title of the note")
@@ -43,11 +80,82 @@ class NoteListResponse(BaseModel):
 class NotesResponse(BaseModel):
     notes: List[NoteListResponse]
     total: int = Field(..., description="Total number of notes")
+    next_cursor: Optional[str] = Field(None, description="Cursor of the next page (paginated mode)")
+    prev_cursor: Optional[str] = Field(None, description="Cursor of the previous page (paginated mode)")
+
+
+class SyncNoteResponse(BaseModel):
+    note_id: int = Field(..., description="ID of the note")
+    title: str = Field(..., description="Title of the note")
+    body: str | None = Field(None, description="Body of the note")
+    emotions: list[str] | None = Field(None, description="List of emotions associated with the note")
+    createdAt: datetime = Field(..., description="Creation date of the note")
+    updatedAt: datetime = Field(..., description="Date of the last change of the note")
+
+
+class NoteSyncResponse(BaseModel):
+    notes: List[SyncNoteResponse] = Field(..., description="Notes created or changed since the cursor")
+    deleted: List[int] = Field(..., description="IDs of notes deleted since the cursor")
+    cursor: Optional[str] = Field(..., description="Cursor to pass to the next sync, null when a full sync is required")
+    has_more: bool = Field(..., description="Whether more changes are waiting, sync again right away")
+    full_resync_required: bool = Field(False, description="The cursor is older than the kept deletions: "
+                                                          "drop the local notes and sync again without a cursor")
+
+
+class NoteSearchResultResponse(BaseModel):
+    note_id: int = Field(..., description="ID of the note")
+    title: str = Field(..., description="Title of the note")
+    createdAt: datetime = Field(..., description="Creation date of the note")
+    emotions: Optional[List[EmotionsEnum]] = Field(None, description="List of emotions (max 3)")
+    rank: float = Field(..., description="Relevance of the note to the query, higher is more relevant")
+    snippet: str = Field(..., description="Fragments of the note with the matches wrapped in <b></b>")
+
+
+class NoteSearchResponse(BaseModel):
+    query: str = Field(..., description="The search query")
+    results: List[NoteSearchResultResponse]
+
+
+class SentenceAnalysisResponse(BaseModel):
+    text: str = Field(..., description="Sentence of the note body")
+    start: int = Field(..., description="Offset of the sentence start in the note body")
+    end: int = Field(..., description="Offset of the sentence end in the note body")
+    emotions: List[EmotionsEnum] = Field(..., description="Top 3 predicted emotions of the sentence", max_items=3)
 
 
 class NoteAnalysisResponse(BaseModel):
     note_id: int = Field(..., description="ID of the analyzed note")
     emotions: List[EmotionsEnum] = Field(..., description="Top 3 predicted emotions", max_items=3)
+    model_version: Optional[str] = Field(None, description="Version of the model that made the prediction")
+    sentences: Optional[List[SentenceAnalysisResponse]] = Field(None, description="Per-sentence emotions (detailed mode)")
 
     class Config:
         from_attributes = True
+
+
+class SimilarNoteResponse(BaseModel):
+    note_id: int = Field(..., description="ID of the similar note")
+    title: str = Field(..., description="Title of the note")
+    createdAt: datetime = Field(..., description="Creation date of the note")
+    emotions: Optional[List[EmotionsEnum]] = Field(None, description="List of emotions (max 3)")
+    score: float = Field(..., description="Cosine similarity to the requested note")
+
+
+class SimilarNotesResponse(BaseModel):
+    note_id: int = Field(..., description="ID of the requested note")
+    similar: List[SimilarNoteResponse]
+
+
+class MoodSummaryResponse(BaseModel):
+    notes_analyzed: int = Field(..., description="Number of analyzed notes in the period")
+    emotions: Dict[EmotionsEnum, float] = Field(..., description="Average probability of every emotion, in percent")
+
+
+class MoodTrendBucketResponse(BaseModel):
+    start: date = Field(..., description="First day of the bucket")
+    emotions: Dict[EmotionsEnum, int] = Field(..., description="Number of notes with every emotion in the bucket")
+
+
+class MoodTrendsResponse(BaseModel):
+    bucket: str = Field(..., description="Bucket size: day, week or month")
+    buckets: List[MoodTrendBucketResponse] = Field(..., description="Buckets with at least one emotion, oldest first")
@@ -1,7 +1,7 @@
 from pydantic import BaseModel, Field
 from datetime import datetime
 from typing import Optional, List, TypeVar, Generic
-from app.db.enums import SexEnum, RequestStatusEnum
+from app.db.enums import SexEnum, RequestStatusEnum, EmotionsEnum
 
 
 class DocumentResponse(BaseModel):
@@ -31,13 +31,41 @@ T = TypeVar("T")
 class PaginatedResponse(BaseModel, Generic[T]):
     items: List[T] = Field(..., description="List of items")
     total: int = Field(..., description="Total number of items")
-    page: int = Field(..., description="Current page number")
+    page: Optional[int] = Field(None, description="Current page number, only set when paging by page number")
     size: int = Field(..., description="Number of items per page")
+    next_cursor: Optional[str] = Field(None, description="Cursor of the next page, absent on the last page")
+    prev_cursor: Optional[str] = Field(None, description="Cursor of the previous page, absent on the first page")
 
     class Config:
         from_attributes = True
 
 
+class ClientSearchItemResponse(BaseModel):
+    client_id: int
+    login: str
+
+
+class ClientSearchResponse(BaseModel):
+    query: str = Field(..., description="The search query")
+    items: List[ClientSearchItemResponse] = Field(..., description="Matching clients, the best matches first")
+
+
+class DashboardClientResponse(BaseModel):
+    client_id: int
+    login: str
+    first_name: str
+    last_name: str
+    client_photo: Optional[str] = None
+    last_note_at: Optional[datetime] = Field(None, description="When the client wrote the last note")
+    recent_notes: int = Field(..., description="Number of notes written in the period")
+    dominant_emotions: List[EmotionsEnum] = Field(..., description="Most frequent emotions of the period, up to 3")
+
+
+class DashboardResponse(BaseModel):
+    days: int = Field(..., description="Length of the period in days")
+    clients: List[DashboardClientResponse] = Field(..., description="Clients, the most recently active first")
+
+
 class PsychologistRequestResponse(BaseModel):
     request_id: int
     psychologist_id: int
@@ -1,30 +1,38 @@
 from fastapi import HTTPException, status
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select
 
-from app.db.models import Admin, Client, Psychologist, ClientRequest
+from datetime import datetime, timezone
+from typing import Optional
+
+from app.db.models import Admin, Client, Psychologist, ClientRequest, EmailOutbox
 from app.schemas.admin import (
     PaginatedResponse, ClientResponse, PsychologistResponse, AdminResponse,
-    ClientRequestResponse, AdminLoginRequest, AdminLoginResponse
+    ClientRequestResponse, AdminLoginRequest, AdminLoginResponse, EmailOutboxResponse,
+    UserSearchResponse
+)
+from app.db.enums import UserTypeEnum, OutboxStatusEnum
+from app.db.pagination import paginate
+from app.db.search import user_search_query
+from app.core.security import (
+    verify_password_async, hash_password_async, password_needs_rehash,
+    create_jwt_token, password_hashing_pool
 )
-from app.core.security import verify_password, hash_password, create_jwt_token
+from app.core.smtp import smtp_pool
+from app.dependencies import invalidate_principal
 
 
 async def get_all_clients(
     db: AsyncSession,
     page: int = 1,
-    size: int = 10
+    size: int = 10,
+    cursor: Optional[str] = None,
+    estimate_total: bool = False
 ) -> PaginatedResponse:
-    offset = (page - 1) * size
-
-    total_stmt = select(func.count()).select_from(Client)
-    total_result = await db.execute(total_stmt)
-    total = total_result.scalar()
-
-    stmt = select(Client).offset(offset).limit(size)
-    result = await db.execute(stmt)
-    clients = result.scalars().all()
+    result_page = await paginate(db, select(Client), [Client.client_id], size, page, cursor,
+                                 estimate_table=Client.__tablename__ if estimate_total else None)
+    clients = result_page.items
 
     client_responses = [
         ClientResponse(
@@ -41,22 +49,76 @@ async def get_all_clients(
         for c in clients
     ]
 
-    return PaginatedResponse(items=client_responses, total=total, page=page, size=size)
+    return PaginatedResponse(items=client_responses, total=result_page.total, total_is_estimate=estimate_total,
+                             page=None if cursor else page, size=size,
+                             next_cursor=result_page.next_cursor, prev_cursor=result_page.prev_cursor)
 
 
 async def get_all_psychologists(
     db: AsyncSession,
     page: int = 1,
-    size: int = 10
+    size: int = 10,
+    cursor: Optional[str] = None,
+    estimate_total: bool = False
 ) -> PaginatedResponse:
-    offset = (page - 1) * size
+    result_page = await paginate(db, select(Psychologist), [Psychologist.client_id], size, page, cursor,
+                                 estimate_table=Psychologist.__tablename__ if estimate_total else None)
+    psychologists = result_page.items
 
-    total_stmt = select(func.count()).select_from(Psychologist)
-    total_result = await db.execute(total_stmt)
-    total = total_result.scalar()
+    psychologist_responses = [
+        PsychologistResponse(
+            psychologist_id=p.client_id,
+            login=p.login,
+            email=p.email,
+            first_name=p.first_name,
+            last_name=p.last_name,
+            birthAt=p.birthAt,
+            sex=p.sex,
+            psychologist_photo=p.client_photo,
+            psychologist_docs=p.psychologist_docs
+        )
+        for p in psychologists
+    ]
 
-    stmt = select(Psychologist).offset(offset).limit(size)
-    result = await db.execute(stmt)
+    return PaginatedResponse(items=psychologist_responses, total=result_page.total, total_is_estimate=estimate_total,
+                             page=None if cursor else page, size=size,
+                             next_cursor=result_page.next_cursor, prev_cursor=result_page.prev_cursor)
+
+
+async def search_clients(
+    query: str,
+    db: AsyncSession,
+    mode: str = "prefix",
+    limit: int = 20
+) -> UserSearchResponse[ClientResponse]:
+    result = await db.execute(user_search_query(Client, query, mode).limit(limit))
+    clients = result.scalars().all()
+
+    client_responses = [
+        ClientResponse(
+            client_id=c.client_id,
+            login=c.login,
+            email=c.email,
+            first_name=c.first_name,
+            last_name=c.last_name,
+            birthAt=c.birthAt,
+            sex=c.sex,
+            client_photo=c.client_photo,
+            is_verified=c.is_verified
+        )
+        for c in clients
+    ]
+
+    return UserSearchResponse[ClientResponse](query=query, items=client_responses)
+
+
+async def search_psychologists(
+    query: str,
+    db: AsyncSession,
+    mode: str = "prefix",
+    limit: int = 20
+) -> UserSearchResponse[PsychologistResponse]:
+    result = await db.execute(user_search_query(Psychologist, query, mode).limit(limit))
     psychologists = result.scalars().all()
 
     psychologist_responses = [
@@ -74,7 +136,7 @@ async def get_all_psychologists(
         for p in psychologists
     ]
 
-    return PaginatedResponse(items=psychologist_responses, total=total, page=page, size=size)
+    return UserSearchResponse[PsychologistResponse](query=query, items=psychologist_responses)
 
 
 async def delete_client(
@@ -89,6 +151,7 @@ async def delete_client(
     await db.delete(user)
 
     await db.commit()
+    invalidate_principal(UserTypeEnum.CLIENT, user)
     return {"message": f"{user.login} deleted successfully"}
 
 
@@ -104,23 +167,20 @@ async def delete_psychologist(
     await db.delete(user)
 
     await db.commit()
+    invalidate_principal(UserTypeEnum.PSYCHOLOGIST, user)
     return {"message": f"{user.login} deleted successfully"}
 
 
 async def get_all_confirmation_requests(
     db: AsyncSession,
     page: int = 1,
-    size: int = 10
+    size: int = 10,
+    cursor: Optional[str] = None,
+    estimate_total: bool = False
 ) -> PaginatedResponse:
-    offset = (page - 1) * size
-
-    total_stmt = select(func.count()).select_from(ClientRequest)
-    total_result = await db.execute(total_stmt)
-    total = total_result.scalar()
-
-    stmt = select(ClientRequest).offset(offset).limit(size)
-    result = await db.execute(stmt)
-    requests = result.scalars().all()
+    result_page = await paginate(db, select(ClientRequest), [ClientRequest.request_id], size, page, cursor,
+                                 estimate_table=ClientRequest.__tablename__ if estimate_total else None)
+    requests = result_page.items
 
     request_responses = [
         ClientRequestResponse(
@@ -135,27 +195,27 @@ async def get_all_confirmation_requests(
         for r in requests
     ]
 
-    return PaginatedResponse(items=request_responses, total=total, page=page, size=size)
+    return PaginatedResponse(items=request_responses, total=result_page.total, total_is_estimate=estimate_total,
+                             page=None if cursor else page, size=size,
+                             next_cursor=result_page.next_cursor, prev_cursor=result_page.prev_cursor)
 
 
 async def get_all_admins(
     db: AsyncSession,
     page: int = 1,
-    size: int = 10
+    size: int = 10,
+    cursor: Optional[str] = None,
+    estimate_total: bool = False
 ) -> PaginatedResponse:
-    offset = (page - 1) * size
-
-    total_stmt = select(func.count()).select_from(Admin)
-    total_result = await db.execute(total_stmt)
-    total = total_result.scalar()
-
-    stmt = select(Admin).offset(offset).limit(size)
-    result = await db.execute(stmt)
-    admins = result.scalars().all()
+    result_page = await paginate(db, select(Admin), [Admin.admin_id], size, page, cursor,
+                                 estimate_table=Admin.__tablename__ if estimate_total else None)
+    admins = result_page.items
 
     admin_responses = [AdminResponse(admin_id=a.admin_id, login=a.login) for a in admins]
 
-    return PaginatedResponse(items=admin_responses, total=total, page=page, size=size)
+    return PaginatedResponse(items=admin_responses, total=result_page.total, total_is_estimate=estimate_total,
+                             page=None if cursor else page, size=size,
+                             next_cursor=result_page.next_cursor, prev_cursor=result_page.prev_cursor)
 
 async def create_admin(
     login: str,
@@ -167,7 +227,7 @@ async def create_admin(
     if result.scalar_one_or_none():
         raise HTTPException(status_code=400, detail="Admin with this login already exists")
 
-    new_admin = Admin(login=login, password=hash_password(password))
+    new_admin = Admin(login=login, password=await hash_password_async(password))
     db.add(new_admin)
     await db.commit()
     await db.refresh(new_admin)
@@ -180,11 +240,15 @@ async def login_admin_service(login_data: AdminLoginRequest, db: AsyncSession) -
     result = await db.execute(stmt)
     user = result.scalar_one_or_none()
 
-    if not user or not verify_password(login_data.password, user.password):
+    if not user or not await verify_password_async(login_data.password, user.password):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
                             detail="Invalid login or password",
                             headers={"WWW-Authenticate": "Bearer"})
 
+    if password_needs_rehash(user.password):
+        user.password = await hash_password_async(login_data.password)
+        await db.commit()
+
     jwt_token = create_jwt_token(data={"sub": user.login})
 
     user_response = AdminLoginResponse(
@@ -194,3 +258,66 @@ async def login_admin_service(login_data: AdminLoginRequest, db: AsyncSession) -
     )
 
     return user_response
+
+
+def get_password_hashing_stats_service() -> dict:
+    """
+    Queue depth and timings of the password hashing pool of this worker.
+    """
+    return password_hashing_pool.stats()
+
+
+def get_email_delivery_stats_service() -> dict:
+    """
+    Connection reuse and throughput of the SMTP connection pool of this worker.
+    """
+    return smtp_pool.stats()
+
+
+async def get_dead_emails(
+    db: AsyncSession,
+    page: int = 1,
+    size: int = 10,
+    cursor: Optional[str] = None
+) -> PaginatedResponse:
+    stmt = select(EmailOutbox).where(EmailOutbox.status == OutboxStatusEnum.DEAD)
+    result_page = await paginate(db, stmt, [EmailOutbox.outbox_id], size, page, cursor, descending=True)
+    messages = result_page.items
+
+    message_responses = [
+        EmailOutboxResponse(
+            outbox_id=m.outbox_id,
+            recipient=m.recipient,
+            subject=m.subject,
+            status=m.status,
+            attempts=m.attempts,
+            last_error=m.last_error,
+            created_at=m.created_at,
+            next_attempt_at=m.next_attempt_at,
+            sent_at=m.sent_at
+        )
+        for m in messages
+    ]
+
+    return PaginatedResponse(items=message_responses, total=result_page.total, page=None if cursor else page, size=size,
+                             next_cursor=result_page.next_cursor, prev_cursor=result_page.prev_cursor)
+
+
+async def retry_dead_email(
+    outbox_id: int,
+    db: AsyncSession
+) -> dict:
+    stmt = select(EmailOutbox).where(EmailOutbox.outbox_id == outbox_id)
+    result = await db.execute(stmt)
+    message = result.scalar_one_or_none()
+    if not message:
+        raise HTTPException(status_code=404, detail="Email not found")
+    if message.status != OutboxStatusEnum.DEAD:
+        raise HTTPException(status_code=400, detail="Only dead emails can be retried")
+
+    message.status = OutboxStatusEnum.PENDING
+    message.attempts = 0
+    message.next_attempt_at = datetime.now(timezone.utc)
+    await db.commit()
+
+    return {"message": "Email queued for delivery"}
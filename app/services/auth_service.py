@@ -8,7 +8,8 @@ from sqlalchemy.future import select
 from app.db.models import Client, Psychologist, ConfirmationRequest
 from app.db.enums import UserTypeEnum, EmailConfirmationTypeEnum
 from app.schemas.user import UserResetPassConfirm
-from app.core import hash_password, settings
+from app.core import hash_password_async, settings
+from app.dependencies import invalidate_principal
 
 
 async def confirm_email_service(db: AsyncSession, code: str, user: Client) -> dict:
@@ -41,6 +42,7 @@ async def confirm_email_service(db: AsyncSession, code: str, user: Client) -> di
 
         user.is_verified = True
         await db.commit()
+        invalidate_principal(UserTypeEnum.CLIENT, user)
         return {"message": "Email verified successfully"}
 
     raise HTTPException(status_code=400, detail="Invalid confirmation type")
@@ -86,7 +88,8 @@ async def pass_reset_confirmation_service(reset_data: UserResetPassConfirm, db:
 
     confirmation_request.confirmedAt = datetime.now(timezone.utc)
 
-    user.password = hash_password(reset_data.new_password)
+    user.password = await hash_password_async(reset_data.new_password)
     await db.commit()
+    invalidate_principal(reset_data.user_type, user)
 
     return {"message": "Password reset successfully"}
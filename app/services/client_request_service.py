@@ -5,11 +5,13 @@ from fastapi import HTTPException, UploadFile
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy import update
 
 from app.db.models import ClientRequest, Client, Psychologist
 from app.schemas.client_request import ClientRequestUpdate
-from app.db.enums import RequestStatusEnum
+from app.db.enums import RequestStatusEnum, UserTypeEnum
 from app.core import settings
+from app.dependencies import invalidate_principal
 
 
 async def create_psychologist_application(
@@ -86,23 +88,31 @@ async def get_client_request_status_service(client_id: int, db: AsyncSession) ->
 async def update_client_request(request_id: int, update_data: ClientRequestUpdate, db: AsyncSession) -> dict:
     """
     Update the status of a psychologist application (admin only).
+    The application is updated only while it is pending; why it wasn't is looked up afterwards.
     """
-    stmt = select(ClientRequest).where(ClientRequest.request_id == request_id)
+    if update_data.status == RequestStatusEnum.REJECTED and not update_data.rejection_reason:
+        raise HTTPException(status_code=400, detail="Rejection reason is required")
+
+    values = {"status": update_data.status}
+    if update_data.status == RequestStatusEnum.REJECTED:
+        values["rejection_reason"] = update_data.rejection_reason
+
+    stmt = (
+        update(ClientRequest)
+        .where(ClientRequest.request_id == request_id, ClientRequest.status == RequestStatusEnum.PENDING)
+        .values(values)
+        .returning(ClientRequest.client_id, ClientRequest.document, ClientRequest.rejection_reason)
+        .execution_options(synchronize_session=False)
+    )
     result = await db.execute(stmt)
-    application = result.scalar_one_or_none()
+    application = result.first()
 
     if not application:
-        raise HTTPException(status_code=404, detail="Application not found")
-
-    if application.status != RequestStatusEnum.PENDING:
+        stmt = select(ClientRequest.request_id).where(ClientRequest.request_id == request_id)
+        if await db.scalar(stmt) is None:
+            raise HTTPException(status_code=404, detail="Application not found")
         raise HTTPException(status_code=400, detail="Application is already processed")
 
-    application.status = update_data.status
-    if update_data.status == RequestStatusEnum.REJECTED:
-        if not update_data.rejection_reason:
-            raise HTTPException(status_code=400, detail="Rejection reason is required")
-        application.rejection_reason = update_data.rejection_reason
-
     if update_data.status == RequestStatusEnum.APPROVED:
         stmt = select(Client).where(Client.client_id == application.client_id)
         result = await db.execute(stmt)
@@ -126,15 +136,16 @@ async def update_client_request(request_id: int, update_data: ClientRequestUpdat
             psychologist_docs=application.document
         )
         db.add(psychologist)
-        await db.commit()
-        await db.refresh(psychologist)
+        await db.flush()
 
         await db.delete(client)
 
     await db.commit()
+    if update_data.status == RequestStatusEnum.APPROVED:
+        invalidate_principal(UserTypeEnum.CLIENT, client)
 
     return {
         "message": "Application updated successfully",
-        "status": application.status,
+        "status": update_data.status,
         "rejection_reason": application.rejection_reason
     }
@@ -0,0 +1,159 @@
+import asyncio
+import logging
+
+from fastapi import HTTPException
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, func, and_
+
+from app.db.models import Note
+from app.schemas.admin import (
+    ModelRegistryResponse, ModelVersionResponse,
+    StaleNotesResponse, RecomputeNotesResponse
+)
+from app.ml_service import ThreadSafeModelHandler, ModelRegistry, ANALYSIS_FIELDS
+from app.embedding_index import embedding_index
+
+logger = logging.getLogger(__name__)
+
+
+def _stale_notes_condition(active_version: str):
+    # Notes without a model_version got their emotions manually, so they are never considered stale
+    return and_(
+        Note.emotions.isnot(None),
+        Note.model_version.isnot(None),
+        Note.model_version != active_version
+    )
+
+
+def _metadata_text(value) -> str | None:
+    # metadata.json is written by hand or by training scripts, its values may be numbers or anything else
+    return None if value is None else str(value)
+
+
+def get_models_service(
+    registry: ModelRegistry | None,
+    model_handler: ThreadSafeModelHandler
+) -> ModelRegistryResponse:
+    """
+    List the versions available in the model registry and the one currently serving traffic.
+    """
+    versions = registry.list_versions() if registry else []
+
+    return ModelRegistryResponse(
+        active_version=model_handler.model_version,
+        versions=[
+            ModelVersionResponse(
+                version=v["version"],
+                created_at=_metadata_text(v.get("created_at")),
+                description=_metadata_text(v.get("description")),
+                metadata=v
+            )
+            for v in versions
+        ]
+    )
+
+
+async def activate_model_service(
+    version: str,
+    registry: ModelRegistry | None,
+    model_handler: ThreadSafeModelHandler
+) -> dict:
+    """
+    Hot swap the served model: load and warm up the version in the background, then switch traffic to it.
+    The registry pointer is updated only after a successful swap, other workers follow it on their next poll.
+    """
+    if not registry:
+        raise HTTPException(status_code=404, detail="Model registry is not configured")
+
+    try:
+        model_path = registry.get_artifact_path(version)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    try:
+        await asyncio.to_thread(model_handler.swap, model_path, version)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to load model version: {str(e)}")
+
+    registry.set_active_version(version)
+
+    return {"message": "Model version activated successfully", "active_version": version}
+
+
+async def get_stale_notes_service(
+    db: AsyncSession,
+    model_handler: ThreadSafeModelHandler
+) -> StaleNotesResponse:
+    """
+    Count notes whose emotions were predicted by a model version other than the active one.
+    """
+    active_version = model_handler.model_version
+
+    stmt = (
+        select(Note.model_version, func.count())
+        .where(_stale_notes_condition(active_version))
+        .group_by(Note.model_version)
+    )
+    result = await db.execute(stmt)
+    by_version = {version: count for version, count in result.all()}
+
+    return StaleNotesResponse(
+        active_version=active_version,
+        total=sum(by_version.values()),
+        by_version=by_version
+    )
+
+
+async def recompute_stale_notes_service(
+    db: AsyncSession,
+    model_handler: ThreadSafeModelHandler,
+    limit: int = 100
+) -> RecomputeNotesResponse:
+    """
+    Re-analyze up to `limit` stale notes with the active model version.
+    Every note is committed on its own and no transaction stays open while the model runs,
+    so a failing note is only counted in `failed` and the work done before it is kept.
+    """
+    active_version = model_handler.model_version
+
+    stmt = (
+        select(Note.note_id, Note.client_id, Note.body, Note.updatedAt)
+        .where(_stale_notes_condition(active_version))
+        .where(func.length(func.trim(Note.body)) > 0)
+        .order_by(Note.note_id)
+        .limit(limit)
+    )
+    result = await db.execute(stmt)
+    notes = result.all()
+    await db.commit()
+
+    processed = failed = 0
+    for note in notes:
+        try:
+            analysis = await asyncio.to_thread(model_handler.analyze, note.body)
+        except Exception:
+            logger.exception("Re-analysis of note %s failed", note.note_id)
+            failed += 1
+            continue
+
+        # a note edited meanwhile is left alone, the edit has already reset or rescheduled its analysis
+        stmt = (
+            update(Note)
+            .where(Note.note_id == note.note_id, Note.updatedAt == note.updatedAt)
+            .values({field: analysis[field] for field in ANALYSIS_FIELDS})
+        )
+        await db.execute(stmt)
+        await db.commit()
+        embedding_index.invalidate(note.client_id)
+        processed += 1
+
+    remaining_stmt = select(func.count()).select_from(Note).where(_stale_notes_condition(active_version))
+    remaining_result = await db.execute(remaining_stmt)
+
+    return RecomputeNotesResponse(
+        active_version=active_version,
+        processed=processed,
+        failed=failed,
+        remaining=remaining_result.scalar()
+    )
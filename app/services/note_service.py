@@ -1,18 +1,28 @@
-from datetime import datetime, timezone
-from typing import Optional
+from datetime import date, datetime, timedelta, timezone
+from typing import AsyncIterator, Optional
 import asyncio
 
 from fastapi import HTTPException, Depends
 
-from sqlalchemy import select
+from sqlalchemy import Date, Select, case, cast, delete, insert, or_, select, update, func, literal, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.models import Note
+from app.core.config import settings
+from app.db.models import Note, NoteEmotionDaily, NoteTombstone
+from app.db.models.note import NOTE_SEARCH_CONFIG
+from app.db.pagination import paginate, encode_cursor, decode_cursor
+from app.db.session import async_session
+from app.db.enums import EmotionsEnum
 from app.schemas.note import (
     NoteCreate, NoteResponse, NoteAnalysisResponse,
-    NoteUpdate, NotesResponse, NoteListResponse
+    NoteUpdate, NotesResponse, NoteListResponse,
+    SimilarNoteResponse, SimilarNotesResponse, MoodSummaryResponse,
+    NoteSearchResultResponse, NoteSearchResponse, MoodTrendBucketResponse, MoodTrendsResponse,
+    SyncNoteResponse, NoteSyncResponse, NoteBatchRequest, NoteBatchResult, NoteBatchResponse
 )
-from app.ml_service import ThreadSafeModelHandler
+from app.ml_service import ThreadSafeModelHandler, ANALYSIS_FIELDS
+from app.embedding_index import embedding_index
+from app.workers.analysis_queue import schedule_note_analysis
 
 async def create_note(
     client_id: int,
@@ -32,6 +42,9 @@ async def create_note(
     await db.commit()
     await db.refresh(note)
 
+    if note.body and note.body.strip():
+        schedule_note_analysis(note.note_id)
+
     response = NoteResponse(
         note_id=note.note_id,
         title=note.title,
@@ -50,18 +63,30 @@ async def delete_note(
 ) -> dict:
     """
     Delete a note by its ID if it belongs to the client.
+    The note is deleted and its tombstone written by one statement.
     """
-    stmt = select(Note).where(Note.note_id == note_id)
+    deleted = (
+        delete(Note)
+        .where(Note.note_id == note_id, Note.client_id == client_id)
+        .returning(Note.note_id, Note.client_id)
+        .cte("deleted")
+    )
+    stmt = (
+        insert(NoteTombstone)
+        .from_select(
+            ["note_id", "client_id", "deletedAt"],
+            # the application clock, like updatedAt and the sync settle window
+            select(deleted.c.note_id, deleted.c.client_id,
+                   literal(datetime.now(timezone.utc), NoteTombstone.deletedAt.type))
+        )
+        .returning(NoteTombstone.note_id)
+    )
     result = await db.execute(stmt)
-    note = result.scalar_one_or_none()
+    if result.scalar_one_or_none() is None:
+        await _raise_note_write_error(note_id, "delete", db)
 
-    if not note:
-        raise HTTPException(status_code=404, detail="Note not found")
-    if note.client_id != client_id:
-        raise HTTPException(status_code=403, detail="Not authorized to delete this note")
-
-    await db.delete(note)
     await db.commit()
+    embedding_index.invalidate(client_id)
 
     return {"message": "Note deleted successfully"}
 
@@ -74,45 +99,212 @@ async def update_note(
 ) -> NoteResponse:
     """
     Update a note by its ID if it belongs to the client.
+    The note is updated and returned by one statement.
     """
-    stmt = select(Note).where(Note.note_id == note_id)
+    update_dict = update_data.model_dump(exclude_unset=True)
+    values = dict(update_dict)
+
+    # the SET expressions see the row as it was before the update
+    stale_conditions = []
+    if "emotions" in values:
+        emotions_changed = Note.emotions.is_distinct_from(literal(values["emotions"], Note.emotions.type))
+        # emotions are set manually now, not by a model
+        values["model_version"] = case((emotions_changed, None), else_=Note.model_version)
+        stale_conditions.append(emotions_changed)
+    if "body" in values:
+        stale_conditions.append(Note.body.is_distinct_from(values["body"]))
+    if stale_conditions:
+        # the model output describes the previous emotions or body, the next analysis writes a fresh one
+        stale = or_(*stale_conditions)
+        values["emotion_probabilities"] = case((stale, None), else_=Note.emotion_probabilities)
+        values["embedding"] = case((stale, None), else_=Note.embedding)
+
+    stmt = (
+        update(Note)
+        .where(Note.note_id == note_id, Note.client_id == client_id)
+        .values(values)
+        .returning(Note.note_id, Note.title, Note.body, Note.createdAt, Note.emotions)
+        .execution_options(synchronize_session=False)
+    )
     result = await db.execute(stmt)
-    note = result.scalar_one_or_none()
+    note = result.first()
+    if note is None:
+        await _raise_note_write_error(note_id, "update", db)
 
-    if not note:
+    await db.commit()
+    if stale_conditions:
+        embedding_index.invalidate(client_id)
+
+    # emotions sent along with the body are the client's choice, so they are not overwritten by the model
+    if "body" in update_dict and "emotions" not in update_dict:
+        schedule_note_analysis(note.note_id)
+
+    return NoteResponse(
+        note_id=note.note_id,
+        title=note.title,
+        body=note.body,
+        emotions=note.emotions if note.emotions else [],
+        createdAt=note.createdAt
+    )
+
+
+async def _raise_note_write_error(note_id: int, action: str, db: AsyncSession) -> None:
+    """Tell a missing note from someone else's note after a write filtered by both matched no row."""
+    stmt = select(Note.client_id).where(Note.note_id == note_id)
+    if await db.scalar(stmt) is None:
         raise HTTPException(status_code=404, detail="Note not found")
-    if note.client_id != client_id:
-        raise HTTPException(status_code=403, detail="Not authorized to update this note")
+    raise HTTPException(status_code=403, detail=f"Not authorized to {action} this note")
 
-    update_dict = update_data.model_dump(exclude_unset=True)
-    for key, value in update_dict.items():
-        setattr(note, key, value)
+
+async def batch_notes_service(
+    client_id: int,
+    batch: NoteBatchRequest,
+    db: AsyncSession
+) -> NoteBatchResponse:
+    """
+    Run many note operations in one transaction: a single ownership check for all touched notes,
+    then one multi-row INSERT for the creates, one batched UPDATE for the updates and one DELETE
+    for the deletes, in this order. Operations on missing or foreign notes, or setting an empty title,
+    are reported in their result and skipped.
+    """
+    results: dict[int, NoteBatchResult] = {}
+    creates: list[tuple[int, NoteCreate]] = []
+    updates: list[tuple[int, int, dict]] = []
+    deletes: list[tuple[int, int]] = []
+
+    def fail(index: int, op: str, note_id: Optional[int], status: int, detail: str) -> None:
+        results[index] = NoteBatchResult(index=index, op=op, status=status, note_id=note_id, detail=detail)
+
+    for index, operation in enumerate(batch.operations):
+        if operation.op == "create":
+            creates.append((index, operation.data))
+        elif operation.op == "update":
+            fields = operation.data.model_dump(exclude_unset=True)
+            if "title" in fields and fields["title"] is None:
+                fail(index, operation.op, operation.note_id, 400, "Title can't be empty")
+                continue
+            updates.append((index, operation.note_id, fields))
+        else:
+            deletes.append((index, operation.note_id))
+
+    touched = {note_id for _, note_id, _ in updates} | {note_id for _, note_id in deletes}
+    owners = {}
+    if touched:
+        stmt = (
+            select(Note.note_id, Note.client_id, Note.emotions, Note.body)
+            .where(Note.note_id.in_(touched))
+            .order_by(Note.note_id)  # concurrent batches lock shared notes in the same order, so they can't deadlock
+            .with_for_update()
+        )
+        result = await db.execute(stmt)
+        owners = {row.note_id: row for row in result.all()}
+
+    def owned(index: int, op: str, note_id: int) -> bool:
+        if note_id not in owners:
+            fail(index, op, note_id, 404, "Note not found")
+            return False
+        if owners[note_id].client_id != client_id:
+            fail(index, op, note_id, 403, f"Not authorized to {op} this note")
+            return False
+        return True
+
+    to_analyze = []
+
+    if creates:
+        stmt = insert(Note).returning(
+            Note.note_id, Note.title, Note.body, Note.createdAt, Note.emotions, sort_by_parameter_order=True
+        )
+        result = await db.execute(
+            stmt, [{"title": data.title, "body": data.body, "client_id": client_id} for _, data in creates]
+        )
+        for (index, _), row in zip(creates, result.all()):
+            results[index] = NoteBatchResult(index=index, op="create", status=201, note_id=row.note_id,
+                                             note=_note_response(row))
+            if row.body and row.body.strip():
+                to_analyze.append(row.note_id)
+
+    updates = [(index, note_id, fields) for index, note_id, fields in updates if owned(index, "update", note_id)]
+    if updates:
+        rows = []
+        for _, note_id, fields in updates:
+            # same rules as update_note, decided here as a bulk UPDATE takes plain values only
+            emotions_changed = "emotions" in fields and fields["emotions"] != owners[note_id].emotions
+            if emotions_changed:
+                fields["model_version"] = None  # emotions are set manually now, not by a model
+            if emotions_changed or ("body" in fields and fields["body"] != owners[note_id].body):
+                fields["emotion_probabilities"] = None
+                fields["embedding"] = None
+            if fields:
+                rows.append({"note_id": note_id, **fields})
+            # emotions sent along with the body are the client's choice, so they are not overwritten by the model
+            if "body" in fields and "emotions" not in fields:
+                to_analyze.append(note_id)
+        if rows:
+            await db.execute(update(Note), rows)  # bulk UPDATE by primary key, sent as one executemany
+
+        stmt = (
+            select(Note.note_id, Note.title, Note.body, Note.createdAt, Note.emotions)
+            .where(Note.note_id.in_({note_id for _, note_id, _ in updates}))
+        )
+        result = await db.execute(stmt)
+        notes = {row.note_id: row for row in result.all()}
+        for index, note_id, _ in updates:
+            results[index] = NoteBatchResult(index=index, op="update", status=200, note_id=note_id,
+                                             note=_note_response(notes[note_id]))
+
+    deletes = [(index, note_id) for index, note_id in deletes if owned(index, "delete", note_id)]
+    deleted_ids = {note_id for _, note_id in deletes}
+    if deletes:
+        await db.execute(delete(Note).where(Note.note_id.in_(deleted_ids), Note.client_id == client_id))
+        await db.execute(insert(NoteTombstone), [{"note_id": note_id, "client_id": client_id} for note_id in deleted_ids])
+        for index, note_id in deletes:
+            results[index] = NoteBatchResult(index=index, op="delete", status=200, note_id=note_id)
 
     await db.commit()
-    await db.refresh(note)
 
+    if updates or deletes:
+        embedding_index.invalidate(client_id)
+    for note_id in to_analyze:
+        if note_id not in deleted_ids:  # updated, then deleted by the same batch
+            schedule_note_analysis(note_id)
+
+    return NoteBatchResponse(results=[results[index] for index in sorted(results)])
+
+
+def _note_response(note) -> NoteResponse:
     return NoteResponse(
         note_id=note.note_id,
         title=note.title,
         body=note.body,
-        emotions=note.emotions if note.emotions else [],
-        createdAt=note.createdAt
+        createdAt=note.createdAt,
+        emotions=note.emotions if note.emotions else []
     )
 
 
-async def get_client_notes_service(
+def filter_notes_by_emotions(stmt: Select, emotions: Optional[list[EmotionsEnum]], match: str = "any") -> Select:
+    """
+    Keep notes having any (`match="any"`, array overlap) or all (`match="all"`, array containment)
+    of `emotions`. Both operators are served by the GIN index on (client_id, emotions).
+    """
+    if not emotions:
+        return stmt
+    values = literal(list(emotions), Note.emotions.type)
+    return stmt.where(Note.emotions.bool_op("@>" if match == "all" else "&&")(values))
+
+
+def _client_notes_query(
     client_id: int,
-    db: AsyncSession,
-    sort_by: str = "createdAt",
-    sort_order: str = "desc",
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
-    search: Optional[str] = None
-) -> NotesResponse:
-    """
-    Get all notes for a client with sorting, filtering, and search.
-    """
-    stmt = select(Note).where(Note.client_id == client_id)
+    search: Optional[str] = None,
+    emotions: Optional[list[EmotionsEnum]] = None,
+    emotion_match: str = "any"
+) -> Select:
+    # only the columns of NoteListResponse: no body or analysis payload, and plain rows instead of ORM entities
+    stmt = (
+        select(Note.note_id, Note.title, Note.createdAt, Note.emotions)
+        .where(Note.client_id == client_id)
+    )
 
     if start_date and end_date:
         end_date = end_date.replace(hour=23, minute=59, second=59, microsecond=999999, tzinfo=timezone.utc)
@@ -123,9 +315,18 @@ async def get_client_notes_service(
         stmt = stmt.where(Note.createdAt <= end_date)
 
     if search:
-        search_pattern = f"%{search}%"
-        stmt = stmt.where(Note.title.ilike(search_pattern))
+        stmt = stmt.where(Note.search_vector.bool_op("@@")(_note_search_query(search)))
 
+    return filter_notes_by_emotions(stmt, emotions, emotion_match)
+
+
+def _note_search_query(search: str):
+    # web search syntax: quoted phrases, "or" and "-word" work, anything else is never a syntax error
+    return func.websearch_to_tsquery(NOTE_SEARCH_CONFIG, search)
+
+
+def _note_sort_keys(sort_by: str, sort_order: str) -> tuple[list, bool]:
+    """Sort key of the note list, note_id breaks ties so the order is total; the second value is `descending`."""
     valid_sort_by = {"createdAt", "title"}
     if sort_by not in valid_sort_by:
         sort_by = "createdAt"
@@ -133,22 +334,128 @@ async def get_client_notes_service(
     if sort_order not in valid_sort_order:
         sort_order = "desc"
 
-    stmt = stmt.order_by(getattr(Note, sort_by).asc() if sort_order == "asc" else getattr(Note, sort_by).desc())
+    return [getattr(Note, sort_by), Note.note_id], sort_order == "desc"
+
+
+def _note_list_item(note) -> NoteListResponse:
+    return NoteListResponse(
+        note_id=note.note_id,
+        title=note.title,
+        createdAt=note.createdAt,
+        emotions=note.emotions if note.emotions else []
+    )
+
+
+async def get_client_notes_service(
+    client_id: int,
+    db: AsyncSession,
+    sort_by: str = "createdAt",
+    sort_order: str = "desc",
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    search: Optional[str] = None,
+    size: Optional[int] = None,
+    cursor: Optional[str] = None,
+    emotions: Optional[list[EmotionsEnum]] = None,
+    emotion_match: str = "any"
+) -> NotesResponse:
+    """
+    Get notes for a client with sorting, filtering, and search.
+    All notes are returned unless `size` or `cursor` is given, then one page of `size` notes is.
+    """
+    stmt = _client_notes_query(client_id, start_date, end_date, search, emotions, emotion_match)
+    keys, descending = _note_sort_keys(sort_by, sort_order)
+
+    if size is not None or cursor is not None:
+        result_page = await paginate(db, stmt, keys, size or 10, cursor=cursor, descending=descending)
+        return NotesResponse(
+            notes=[_note_list_item(note) for note in result_page.items],
+            total=result_page.total,
+            next_cursor=result_page.next_cursor,
+            prev_cursor=result_page.prev_cursor
+        )
+
+    stmt = stmt.order_by(*(key.desc() if descending else key.asc() for key in keys))
 
     result = await db.execute(stmt)
-    notes = result.scalars().all()
-
-    response_notes = [
-        NoteListResponse(
-            note_id=note.note_id,
-            title=note.title,
-            createdAt=note.createdAt,
-            emotions=note.emotions if note.emotions else []
+    notes = result.all()
+
+    response_notes = [_note_list_item(note) for note in notes]
+
+    return NotesResponse(notes=response_notes, total=len(response_notes))
+
+
+async def stream_client_notes_service(
+    client_id: int,
+    sort_by: str = "createdAt",
+    sort_order: str = "desc",
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    search: Optional[str] = None,
+    emotions: Optional[list[EmotionsEnum]] = None,
+    emotion_match: str = "any"
+) -> AsyncIterator[str]:
+    """
+    Stream all notes of a client as NDJSON, one note per line.
+    Rows are fetched through a server-side cursor in chunks, so memory does not grow with the number of notes.
+    The stream runs after the request's own session is closed, so it opens a session of its own.
+    """
+    stmt = _client_notes_query(client_id, start_date, end_date, search, emotions, emotion_match)
+    keys, descending = _note_sort_keys(sort_by, sort_order)
+    stmt = stmt.order_by(*(key.desc() if descending else key.asc() for key in keys))
+
+    async with async_session() as db:
+        result = await db.stream(stmt.execution_options(yield_per=settings.NOTES_STREAM_CHUNK_SIZE))
+        async for notes in result.partitions():
+            yield "".join(_note_list_item(note).model_dump_json() + "\n" for note in notes)
+
+
+async def search_notes_service(
+    client_id: int,
+    query: str,
+    db: AsyncSession,
+    limit: int = 20
+) -> NoteSearchResponse:
+    """
+    Full-text search over the titles and bodies of the client's notes, the most relevant notes first.
+    """
+    ts_query = _note_search_query(query)
+    rank = func.ts_rank_cd(Note.search_vector, ts_query)
+
+    matches = (
+        select(Note.note_id, Note.title, Note.body, Note.createdAt, Note.emotions, rank.label("rank"))
+        .where(Note.client_id == client_id, Note.search_vector.bool_op("@@")(ts_query))
+        .order_by(rank.desc(), Note.note_id.desc())
+        .limit(limit)
+        .subquery()
+    )
+    # snippets are built only for the notes that made it into the result
+    snippet = func.ts_headline(
+        NOTE_SEARCH_CONFIG,
+        func.coalesce(matches.c.body, matches.c.title),
+        ts_query,
+        "StartSel=<b>, StopSel=</b>, MaxWords=30, MinWords=10, MaxFragments=2"
+    )
+    stmt = (
+        select(matches.c.note_id, matches.c.title, matches.c.createdAt, matches.c.emotions, matches.c.rank,
+               snippet.label("snippet"))
+        .order_by(matches.c.rank.desc(), matches.c.note_id.desc())
+    )
+    result = await db.execute(stmt)
+
+    results = [
+        NoteSearchResultResponse(
+            note_id=row.note_id,
+            title=row.title,
+            createdAt=row.createdAt,
+            emotions=row.emotions if row.emotions else [],
+            rank=row.rank,
+            snippet=row.snippet
         )
-        for note in notes
+        for row in result.all()
     ]
 
-    return NotesResponse(notes=response_notes, total=len(response_notes))
+    return NoteSearchResponse(query=query, results=results)
 
 
 async def get_note_by_id_service(
@@ -181,10 +488,12 @@ async def analyze_note(
     note_id: int,
     client_id: int,
     db: AsyncSession,
-    model_handler: ThreadSafeModelHandler = Depends()
+    model_handler: ThreadSafeModelHandler = Depends(),
+    detailed: bool = False
 ) -> NoteAnalysisResponse:
     """
-    Analyze a note by its ID using RoBertaModel and return the top 3 emotions.
+    Analyze a note by its ID using RoBertaModel, store and return the top 3 emotions.
+    In detailed mode the body is analyzed sentence by sentence in one batch, the stored emotions are the aggregate.
     """
     stmt = select(Note).where(Note.note_id == note_id)
     result = await db.execute(stmt)
@@ -199,11 +508,243 @@ async def analyze_note(
         raise HTTPException(status_code=400, detail="Note body is empty or invalid")
 
     try:
-        predicted_emotions = await asyncio.to_thread(model_handler.predict, note.body)
+        analysis = await asyncio.to_thread(model_handler.analyze, note.body, detailed)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
+    for field in ANALYSIS_FIELDS:
+        setattr(note, field, analysis[field])
+    await db.commit()
+    embedding_index.invalidate(client_id)
+
     return NoteAnalysisResponse(
         note_id=note.note_id,
-        emotions=predicted_emotions
+        emotions=analysis["emotions"],
+        model_version=analysis["model_version"],
+        sentences=analysis.get("sentences")
+    )
+
+
+async def find_similar_notes(
+    note_id: int,
+    client_id: int,
+    db: AsyncSession,
+    limit: int = 5
+) -> SimilarNotesResponse:
+    """
+    Find the client's notes closest to the given one by embedding (cosine similarity).
+    Ownership of the note must be checked by the caller.
+    """
+    stmt = select(Note.embedding, Note.model_version).where(Note.note_id == note_id)
+    result = await db.execute(stmt)
+    note = result.first()
+
+    if note is None or note.embedding is None or note.model_version is None:
+        raise HTTPException(status_code=400, detail="Note has not been analyzed yet")
+
+    matches = await embedding_index.search(
+        client_id, note.model_version, note.embedding, db, limit, exclude_note_id=note_id
+    )
+    if not matches:
+        return SimilarNotesResponse(note_id=note_id, similar=[])
+
+    scores = dict(matches)
+    stmt = (
+        select(Note.note_id, Note.title, Note.createdAt, Note.emotions)
+        .where(Note.client_id == client_id, Note.note_id.in_(scores.keys()))
+    )
+    result = await db.execute(stmt)
+    rows = {row.note_id: row for row in result.all()}
+
+    similar = [
+        SimilarNoteResponse(
+            note_id=rows[similar_id].note_id,
+            title=rows[similar_id].title,
+            createdAt=rows[similar_id].createdAt,
+            emotions=rows[similar_id].emotions if rows[similar_id].emotions else [],
+            score=score
+        )
+        for similar_id, score in matches
+        if similar_id in rows  # the note may have been deleted after the index was built
+    ]
+
+    return SimilarNotesResponse(note_id=note_id, similar=similar)
+
+
+async def get_similar_notes_service(
+    note_id: int,
+    client_id: int,
+    db: AsyncSession,
+    limit: int = 5
+) -> SimilarNotesResponse:
+    """
+    Get the client's past notes most similar to a specific note if it belongs to the client.
+    """
+    stmt = select(Note.client_id).where(Note.note_id == note_id)
+    result = await db.execute(stmt)
+    owner_id = result.scalar_one_or_none()
+
+    if owner_id is None:
+        raise HTTPException(status_code=404, detail="Note not found")
+    if owner_id != client_id:
+        raise HTTPException(status_code=403, detail="Not authorized to view this note")
+
+    return await find_similar_notes(note_id, client_id, db, limit)
+
+
+async def get_mood_summary_service(
+    client_id: int,
+    db: AsyncSession,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None
+) -> MoodSummaryResponse:
+    """
+    Average the stored emotion probabilities of the client's notes in SQL, without running the model.
+    Only notes whose emotions still come from the model are counted, manually set emotions have no probabilities.
+    """
+    emotions = list(EmotionsEnum)
+    stmt = select(
+        func.count(Note.emotion_probabilities),
+        *[func.avg(Note.emotion_probabilities[position + 1]) for position in range(len(emotions))]
+    ).where(Note.client_id == client_id, Note.model_version.isnot(None))
+
+    if start_date:
+        stmt = stmt.where(Note.createdAt >= start_date)
+    if end_date:
+        stmt = stmt.where(Note.createdAt <= end_date)
+
+    result = await db.execute(stmt)
+    notes_analyzed, *averages = result.one()
+
+    return MoodSummaryResponse(
+        notes_analyzed=notes_analyzed,
+        emotions={
+            emotion: round(float(average) * 100, 2) if average is not None else 0.0
+            for emotion, average in zip(emotions, averages)
+        }
+    )
+
+
+async def get_mood_trends_service(
+    client_id: int,
+    db: AsyncSession,
+    bucket: str = "week",
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None
+) -> MoodTrendsResponse:
+    """
+    Count the client's notes per emotion in day, week or month buckets (UTC days).
+    Reads only the daily emotion rollups, so the cost depends on the number of days, not of notes.
+    """
+    bucket_start = cast(func.date_trunc(bucket, NoteEmotionDaily.day), Date).label("bucket_start")
+    stmt = (
+        select(bucket_start, NoteEmotionDaily.emotion, func.sum(NoteEmotionDaily.count).label("count"))
+        .where(NoteEmotionDaily.client_id == client_id, NoteEmotionDaily.count > 0)
+        .group_by(bucket_start, NoteEmotionDaily.emotion)
+        .order_by(bucket_start)
+    )
+    if start_date:
+        stmt = stmt.where(NoteEmotionDaily.day >= start_date)
+    if end_date:
+        stmt = stmt.where(NoteEmotionDaily.day <= end_date)
+
+    result = await db.execute(stmt)
+
+    buckets: dict[date, dict[EmotionsEnum, int]] = {}
+    for row in result.all():
+        buckets.setdefault(row.bucket_start, {})[row.emotion] = int(row.count)
+
+    return MoodTrendsResponse(
+        bucket=bucket,
+        buckets=[MoodTrendBucketResponse(start=start, emotions=emotions) for start, emotions in buckets.items()]
+    )
+
+
+SYNC_CURSOR_KEYS = [Note.updatedAt, Note.note_id, NoteTombstone.deletedAt, NoteTombstone.note_id]
+SYNC_START = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _sync_notes_query(client_id: int, settled: datetime, updated_at: datetime, updated_id: int, limit: int) -> Select:
+    return (
+        select(Note.note_id, Note.title, Note.body, Note.emotions, Note.createdAt, Note.updatedAt)
+        .where(
+            Note.client_id == client_id,
+            Note.updatedAt < settled,
+            tuple_(Note.updatedAt, Note.note_id) > tuple_(updated_at, updated_id)
+        )
+        .order_by(Note.updatedAt, Note.note_id)
+        .limit(limit + 1)
+    )
+
+
+def _sync_tombstones_query(client_id: int, settled: datetime, deleted_at: datetime, deleted_id: int, limit: int) -> Select:
+    return (
+        select(NoteTombstone.note_id, NoteTombstone.deletedAt)
+        .where(
+            NoteTombstone.client_id == client_id,
+            NoteTombstone.deletedAt < settled,
+            tuple_(NoteTombstone.deletedAt, NoteTombstone.note_id) > tuple_(deleted_at, deleted_id)
+        )
+        .order_by(NoteTombstone.deletedAt, NoteTombstone.note_id)
+        .limit(limit + 1)
+    )
+
+
+async def sync_notes_service(
+    client_id: int,
+    db: AsyncSession,
+    cursor: Optional[str] = None,
+    limit: int = 500
+) -> NoteSyncResponse:
+    """
+    Changes of the client's notes since `cursor`: created or updated notes in the order of updatedAt,
+    and ids of deleted notes. Without a cursor all notes are returned (paged by `limit`).
+    Changes younger than NOTES_SYNC_SETTLE_SECONDS are left for the next sync: a transaction that stamped
+    an earlier updatedAt may still be committing, and the cursor would otherwise skip its changes.
+    Tombstones are purged after NOTES_SYNC_TOMBSTONE_RETENTION_DAYS, a cursor older than that
+    may have missed deletions and gets `full_resync_required` instead of changes.
+    Both timestamps and `settled` come from the application clock.
+    """
+    now = datetime.now(timezone.utc)
+    settled = now - timedelta(seconds=settings.NOTES_SYNC_SETTLE_SECONDS)
+    if cursor is not None:
+        (updated_at, updated_id, deleted_at, deleted_id), _ = decode_cursor(cursor, SYNC_CURSOR_KEYS)
+        if deleted_at < now - timedelta(days=settings.NOTES_SYNC_TOMBSTONE_RETENTION_DAYS):
+            return NoteSyncResponse(notes=[], deleted=[], cursor=None, has_more=False, full_resync_required=True)
+    else:
+        # a full sync has never seen the notes deleted before it, so their tombstones are skipped
+        updated_at, updated_id, deleted_at, deleted_id = SYNC_START, 0, settled, 0
+
+    result = await db.execute(_sync_notes_query(client_id, settled, updated_at, updated_id, limit))
+    notes = result.all()
+
+    result = await db.execute(_sync_tombstones_query(client_id, settled, deleted_at, deleted_id, limit))
+    tombstones = result.all()
+
+    more_tombstones = len(tombstones) > limit
+    has_more = len(notes) > limit or more_tombstones
+    notes, tombstones = notes[:limit], tombstones[:limit]
+    if notes:
+        updated_at, updated_id = notes[-1].updatedAt, notes[-1].note_id
+    if more_tombstones:
+        deleted_at, deleted_id = tombstones[-1].deletedAt, tombstones[-1].note_id
+    else:
+        # every tombstone before `settled` is seen, so the cursor moves up to it and stays within the retention
+        deleted_at, deleted_id = settled, 0
+
+    return NoteSyncResponse(
+        notes=[
+            SyncNoteResponse(
+                note_id=note.note_id,
+                title=note.title,
+                body=note.body,
+                emotions=note.emotions if note.emotions else [],
+                createdAt=note.createdAt,
+                updatedAt=note.updatedAt
+            )
+            for note in notes
+        ],
+        deleted=[tombstone.note_id for tombstone in tombstones],
+        cursor=encode_cursor([updated_at, updated_id, deleted_at, deleted_id]),
+        has_more=has_more
     )
@@ -2,7 +2,7 @@ from fastapi import HTTPException
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import insert
+from sqlalchemy import insert, update
 from sqlalchemy.orm import joinedload
 
 from app.db.models import PsychologistRequest, Psychologist, client_psychologist
@@ -51,31 +51,41 @@ async def update_psychologist_request_status(
 ) -> dict:
     """
     Update the status of a psychologist request and handle acceptance.
+    The request is updated only if it is the client's pending one; why it wasn't is looked up afterwards.
     """
-    stmt = select(PsychologistRequest).where(PsychologistRequest.request_id == request_id)
+    stmt = (
+        update(PsychologistRequest)
+        .where(
+            PsychologistRequest.request_id == request_id,
+            PsychologistRequest.client_id == client_id,
+            PsychologistRequest.status == RequestStatusEnum.PENDING
+        )
+        .values(status=status)
+        .returning(PsychologistRequest.psychologist_id)
+        .execution_options(synchronize_session=False)
+    )
     result = await db.execute(stmt)
-    request = result.scalar_one_or_none()
+    psychologist_id = result.scalar_one_or_none()
 
-    if not request:
-        raise HTTPException(status_code=404, detail="Request not found")
-    if request.client_id != client_id:
-        raise HTTPException(status_code=403, detail="Not authorized to update this request")
-    if request.status != RequestStatusEnum.PENDING:
+    if psychologist_id is None:
+        stmt = select(PsychologistRequest.client_id).where(PsychologistRequest.request_id == request_id)
+        result = await db.execute(stmt)
+        request = result.first()
+        if not request:
+            raise HTTPException(status_code=404, detail="Request not found")
+        if request.client_id != client_id:
+            raise HTTPException(status_code=403, detail="Not authorized to update this request")
         raise HTTPException(status_code=400, detail="Request is not pending")
 
-    request.status = status
-    await db.commit()
-    await db.refresh(request)
-
     if status == RequestStatusEnum.APPROVED:
         stmt = insert(client_psychologist).values(
-            client_id=request.client_id,
-            psychologist_id=request.psychologist_id
+            client_id=client_id,
+            psychologist_id=psychologist_id
         )
         await db.execute(stmt)
-        await db.commit()
+    await db.commit()
 
     return {
         "message": "Request status updated successfully",
-        "status": request.status
+        "status": status
     }
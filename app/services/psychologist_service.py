@@ -1,19 +1,28 @@
 import os
+from datetime import datetime, timedelta, timezone
+from typing import Optional
 
 from fastapi import HTTPException
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import and_, delete, func
+from sqlalchemy import and_, delete, func, true
+from sqlalchemy.dialects.postgresql import ARRAY, aggregate_order_by
 
-from app.db.enums import RequestStatusEnum
-from app.db.models import Client, Psychologist, Note, PsychologistRequest, client_psychologist
+from app.db.enums import RequestStatusEnum, UserTypeEnum, EmotionsEnum
+from app.db.models import Client, Psychologist, Note, NoteEmotionDaily, PsychologistRequest, client_psychologist
 from app.schemas.user import PsychologistInfoResponse
 from app.schemas.psychologist import ( 
     DocumentResponse, ClientBase, PaginatedResponse,
-    NoteResponse, PsychologistRequestResponse
+    NoteResponse, PsychologistRequestResponse, ClientSearchResponse, ClientSearchItemResponse,
+    DashboardClientResponse, DashboardResponse
 )
+from app.schemas.note import SimilarNotesResponse
+from app.services.note_service import find_similar_notes, filter_notes_by_emotions
 from app.core.config import settings
+from app.db.pagination import paginate
+from app.db.search import user_search_query
+from app.dependencies import invalidate_principal
 
 
 async def get_client_psychologists_service(
@@ -118,6 +127,7 @@ async def revert_to_client(
 
     await db.delete(psychologist)
     await db.commit()
+    invalidate_principal(UserTypeEnum.PSYCHOLOGIST, psychologist)
 
     return {"message": "Psychologist reverted to client successfully", "client_id": client.client_id}
 
@@ -126,27 +136,16 @@ async def get_psychologist_clients(
     psychologist_id: int,
     db: AsyncSession,
     page: int = 1,
-    size: int = 10
+    size: int = 10,
+    cursor: Optional[str] = None
 ) -> PaginatedResponse[ClientBase]:
-    offset = (page - 1) * size
-
     stmt = (
         select(Client)
         .join(client_psychologist)
         .where(client_psychologist.c.psychologist_id == psychologist_id)
-        .offset(offset)
-        .limit(size)
-    )
-    result = await db.execute(stmt)
-    clients = result.scalars().all()
-
-    total_stmt = (
-        select(func.count())
-        .select_from(client_psychologist)
-        .where(client_psychologist.c.psychologist_id == psychologist_id)
     )
-    total_result = await db.execute(total_stmt)
-    total = total_result.scalar()
+    result_page = await paginate(db, stmt, [Client.client_id], size, page, cursor)
+    clients = result_page.items
 
     client_responses = [
         ClientBase(
@@ -163,7 +162,84 @@ async def get_psychologist_clients(
         for c in clients
     ]
 
-    return PaginatedResponse[ClientBase](items=client_responses, total=total, page=page, size=size)
+    return PaginatedResponse[ClientBase](items=client_responses, total=result_page.total, page=None if cursor else page, size=size,
+                                         next_cursor=result_page.next_cursor, prev_cursor=result_page.prev_cursor)
+
+
+async def get_caseload_dashboard_service(
+    psychologist_id: int,
+    db: AsyncSession,
+    days: int = 30
+) -> DashboardResponse:
+    """
+    Activity of all the psychologist's clients over the last `days` days, computed in a single query:
+    the last note time and the recent note count come from the (client_id, createdAt) note index,
+    the dominant emotions from the daily emotion rollups through a lateral join.
+    """
+    since = datetime.now(timezone.utc) - timedelta(days=days)
+
+    last_note_at = (
+        select(Note.createdAt)
+        .where(Note.client_id == Client.client_id)
+        .order_by(Note.createdAt.desc())
+        .limit(1)
+        .scalar_subquery()
+        .label("last_note_at")
+    )
+    recent_notes = (
+        select(func.count())
+        .select_from(Note)
+        .where(Note.client_id == Client.client_id, Note.createdAt >= since)
+        .scalar_subquery()
+        .label("recent_notes")
+    )
+    emotion_totals = (
+        select(NoteEmotionDaily.emotion, func.sum(NoteEmotionDaily.count).label("total"))
+        .where(
+            NoteEmotionDaily.client_id == Client.client_id,
+            NoteEmotionDaily.day >= since.date(),
+            NoteEmotionDaily.count > 0
+        )
+        .group_by(NoteEmotionDaily.emotion)
+        .order_by(func.sum(NoteEmotionDaily.count).desc(), NoteEmotionDaily.emotion)
+        .limit(3)
+        .correlate(Client)
+        .subquery("emotion_totals")
+    )
+    dominant_emotions = select(
+        func.array_agg(
+            aggregate_order_by(emotion_totals.c.emotion, emotion_totals.c.total.desc(), emotion_totals.c.emotion),
+            type_=ARRAY(NoteEmotionDaily.emotion.type)
+        ).label("emotions")
+    ).lateral("dominant_emotions")
+
+    stmt = (
+        select(
+            Client.client_id, Client.login, Client.first_name, Client.last_name, Client.client_photo,
+            last_note_at, recent_notes, dominant_emotions.c.emotions
+        )
+        .join(client_psychologist, client_psychologist.c.client_id == Client.client_id)
+        .outerjoin(dominant_emotions, true())
+        .where(client_psychologist.c.psychologist_id == psychologist_id)
+        .order_by(last_note_at.desc().nulls_last(), Client.client_id)
+    )
+    result = await db.execute(stmt)
+
+    clients = [
+        DashboardClientResponse(
+            client_id=row.client_id,
+            login=row.login,
+            first_name=row.first_name,
+            last_name=row.last_name,
+            client_photo=row.client_photo,
+            last_note_at=row.last_note_at,
+            recent_notes=row.recent_notes,
+            dominant_emotions=row.emotions or []
+        )
+        for row in result.all()
+    ]
+
+    return DashboardResponse(days=days, clients=clients)
 
 
 async def get_client_notes_for_psychologist(
@@ -171,10 +247,11 @@ async def get_client_notes_for_psychologist(
     client_id: int,
     db: AsyncSession,
     page: int = 1,
-    size: int = 10
+    size: int = 10,
+    cursor: Optional[str] = None,
+    emotions: Optional[list[EmotionsEnum]] = None,
+    emotion_match: str = "any"
 ) -> PaginatedResponse[NoteResponse]:
-    offset = (page - 1) * size
-
     stmt_check = (
         select(client_psychologist)
         .where(client_psychologist.c.psychologist_id == psychologist_id)
@@ -184,22 +261,14 @@ async def get_client_notes_for_psychologist(
     if not result_check.first():
         raise HTTPException(status_code=403, detail="Client is not assigned to this psychologist")
 
-    total_stmt = (
-        select(func.count())
-        .select_from(Note)
-        .where(Note.client_id == client_id)
-    )
-    total_result = await db.execute(total_stmt)
-    total = total_result.scalar()
-
+    # newest notes first
     stmt = (
-        select(Note)
+        select(Note.note_id, Note.title, Note.body, Note.createdAt, Note.emotions)
         .where(Note.client_id == client_id)
-        .offset(offset)
-        .limit(size)
     )
-    result = await db.execute(stmt)
-    notes = result.scalars().all()
+    stmt = filter_notes_by_emotions(stmt, emotions, emotion_match)
+    result_page = await paginate(db, stmt, [Note.createdAt, Note.note_id], size, page, cursor, descending=True)
+    notes = result_page.items
 
     note_responses = [
         NoteResponse(
@@ -212,7 +281,32 @@ async def get_client_notes_for_psychologist(
         for n in notes
     ]
 
-    return PaginatedResponse[NoteResponse](items=note_responses, total=total, page=page, size=size)
+    return PaginatedResponse[NoteResponse](items=note_responses, total=result_page.total, page=None if cursor else page, size=size,
+                                           next_cursor=result_page.next_cursor, prev_cursor=result_page.prev_cursor)
+
+
+async def get_similar_client_notes_for_psychologist(
+    psychologist_id: int,
+    client_id: int,
+    note_id: int,
+    db: AsyncSession,
+    limit: int = 5
+) -> SimilarNotesResponse:
+    stmt_check = (
+        select(client_psychologist)
+        .where(client_psychologist.c.psychologist_id == psychologist_id)
+        .where(client_psychologist.c.client_id == client_id)
+    )
+    result_check = await db.execute(stmt_check)
+    if not result_check.first():
+        raise HTTPException(status_code=403, detail="Client is not assigned to this psychologist")
+
+    stmt = select(Note.note_id).where(Note.note_id == note_id, Note.client_id == client_id)
+    result = await db.execute(stmt)
+    if result.scalar_one_or_none() is None:
+        raise HTTPException(status_code=404, detail="Note not found")
+
+    return await find_similar_notes(note_id, client_id, db, limit)
 
 
 async def search_client_by_login(
@@ -238,6 +332,26 @@ async def search_client_by_login(
         is_verified=client.is_verified
     )
 
+
+async def search_clients_service(
+    query: str,
+    db: AsyncSession,
+    mode: str = "prefix",
+    limit: int = 20
+) -> ClientSearchResponse:
+    """
+    Search clients by login only and return only their id and login,
+    so psychologists can find a client they know without browsing the clients' personal data.
+    """
+    stmt = user_search_query(Client, query, mode, columns=("login",)).with_only_columns(Client.client_id, Client.login)
+    result = await db.execute(stmt.limit(limit))
+
+    return ClientSearchResponse(
+        query=query,
+        items=[ClientSearchItemResponse(client_id=row.client_id, login=row.login) for row in result.all()]
+    )
+
+
 async def create_psychologist_request(
     psychologist_id: int,
     client_id: int,
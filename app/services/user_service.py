@@ -15,9 +15,11 @@ from app.schemas.user import (
 from app.db.models import Client, Psychologist, ConfirmationRequest
 from app.db.enums import EmailConfirmationTypeEnum, UserTypeEnum
 from app.core import (
-    settings, send_confirmation_email,
-    hash_password, verify_password, create_jwt_token
+    settings, enqueue_confirmation_email,
+    hash_password_async, verify_password_async,
+    password_needs_rehash, create_user_jwt_token
 )
+from app.dependencies import invalidate_principal, get_user_by_id
 
 
 async def register_user_service(user_data: UserCreate, db: AsyncSession) -> UserResponse:
@@ -42,7 +44,7 @@ async def register_user_service(user_data: UserCreate, db: AsyncSession) -> User
     if result_login.scalar_one_or_none():
         raise HTTPException(status_code=400, detail="Login already taken")
 
-    hashed_password = hash_password(user_data.password)
+    hashed_password = await hash_password_async(user_data.password)
 
     # Convert the birthdate string to a datetime object
     try:
@@ -65,7 +67,7 @@ async def register_user_service(user_data: UserCreate, db: AsyncSession) -> User
     await db.flush()  # get user_id but without commiting
     await db.refresh(user)
 
-    jwt_token = create_jwt_token(data={"sub": user.login, "user_type": UserTypeEnum.CLIENT})
+    jwt_token = create_user_jwt_token(user.client_id, user.login, UserTypeEnum.CLIENT)
 
     user_response = UserResponse(
         user_id=user.client_id,
@@ -93,13 +95,9 @@ async def register_user_service(user_data: UserCreate, db: AsyncSession) -> User
         type=EmailConfirmationTypeEnum.REGISTRATION
     )
 
-    try:
-        await send_confirmation_email(user_data.email, confirmation_code, "registration")
-    except Exception as e:
-        await db.rollback()
-        raise HTTPException(status_code=500, detail="Failed to send confirmation email")
-
+    # the email is delivered by the outbox worker once the user and the code are committed
     db.add(confirmation_code_request)
+    enqueue_confirmation_email(db, user_data.email, confirmation_code, "registration")
     await db.commit()
 
     return user_response
@@ -126,12 +124,17 @@ async def login_user_service(login_data: UserLogin, db: AsyncSession) -> UserRes
         result = await db.execute(stmt)
         user = result.scalar_one_or_none()
 
-    if not user or not verify_password(login_data.password, user.password):
+    if not user or not await verify_password_async(login_data.password, user.password):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
                             detail="Invalid login or password",
                             headers={"WWW-Authenticate": "Bearer"})
 
-    jwt_token = create_jwt_token(data={"sub": user.login, "user_type": login_data.user_type})
+    # the password is known only now, so this is the moment to bring its hash to the current cost
+    if password_needs_rehash(user.password):
+        user.password = await hash_password_async(login_data.password)
+        await db.commit()
+
+    jwt_token = create_user_jwt_token(user.client_id, user.login, login_data.user_type)
 
     user_response = UserResponse(
         user_id=user.client_id,
@@ -162,23 +165,17 @@ async def update_password_service(update_info: UserUpdatePassword, db: AsyncSess
         UserResponse: An object containing the updated user's data.
     """
 
-    if update_info.user_type == UserTypeEnum.CLIENT:
-        stmt = select(Client).where(Client.client_id == update_info.user_id)
-        result = await db.execute(stmt)
-        user = result.scalar_one_or_none()
-    else:
-        stmt = select(Psychologist).where(Psychologist.client_id == update_info.user_id)
-        result = await db.execute(stmt)
-        user = result.scalar_one_or_none()
+    user = await get_user_by_id(db, update_info.user_type, update_info.user_id)
 
-    if not user or not verify_password(update_info.old_password, user.password):
+    if not user or not await verify_password_async(update_info.old_password, user.password):
         raise HTTPException(status_code=401, detail="Invalid old password")
 
-    user.password = hash_password(update_info.new_password)
+    user.password = await hash_password_async(update_info.new_password)
     await db.commit()
     await db.refresh(user)
+    invalidate_principal(update_info.user_type, user)
 
-    jwt_token = create_jwt_token(data={"sub": user.login, "user_type": update_info.user_type})
+    jwt_token = create_user_jwt_token(user.client_id, user.login, update_info.user_type)
 
     user_response = UserResponse(
         user_id=user.client_id,
@@ -234,32 +231,32 @@ async def reset_password_service(reset_data: UserResetPass, db: AsyncSession) ->
         type=EmailConfirmationTypeEnum.PASSWORD_RESET
     )
 
-    try:
-        await send_confirmation_email(reset_data.email, confirmation_code, "password_reset")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail="Failed to send confirmation email")
-
     db.add(confirmation_code_request)
+    enqueue_confirmation_email(db, reset_data.email, confirmation_code, "password_reset")
     await db.commit()
 
     return {"message": "Email message with the confirmation code is sent."}
 
 
-async def update_user_profile_service(user_login: str, update_data: UserUpdate, db: AsyncSession) -> UserSchema:
+async def update_user_profile_service(
+        user_id: int,
+        user_type: UserTypeEnum,
+        update_data: UserUpdate,
+        db: AsyncSession
+) -> UserSchema:
     """
     Update the user's profile information.
 
     Args:
-        user_login (str): The login of the user to be updated.
+        user_id (int): The ID of the user to be updated.
+        user_type (UserTypeEnum): The type of the user, ids of clients and psychologists overlap.
         update_data (UserUpdate): The new data for the user.
         db (AsyncSession): The database session.
 
     Returns:
         UserResponse: An object containing the updated user's data.
     """
-    stmt = select(Client).where(Client.login == user_login)
-    result = await db.execute(stmt)
-    user = result.scalar_one_or_none()
+    user = await get_user_by_id(db, user_type, user_id)
 
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
@@ -278,6 +275,7 @@ async def update_user_profile_service(user_login: str, update_data: UserUpdate,
 
     await db.commit()
     await db.refresh(user)
+    invalidate_principal(user_type, user)
 
     user_response = UserSchema(
         user_id=user.client_id,
@@ -289,14 +287,14 @@ async def update_user_profile_service(user_login: str, update_data: UserUpdate,
         sex=user.sex,
         client_photo=user.client_photo,
         is_verified=user.is_verified,
-        user_type=UserTypeEnum.CLIENT
+        user_type=user_type
     )
 
     return user_response
 
 
 async def update_user_photo(
-        user_login: str,
+        user_id: int,
         update_data: dict,
         db: AsyncSession
 ) -> dict:
@@ -306,14 +304,7 @@ async def update_user_photo(
 
     photo: UploadFile = update_data.get("photo")
 
-    if update_data["user_type"] == UserTypeEnum.CLIENT:
-        stmt = select(Client).where(Client.login == user_login)
-        result = await db.execute(stmt)
-        user = result.scalar_one_or_none()
-    else:
-        stmt = select(Psychologist).where(Psychologist.login == user_login)
-        result = await db.execute(stmt)
-        user = result.scalar_one_or_none()
+    user = await get_user_by_id(db, update_data["user_type"], user_id)
 
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
@@ -334,6 +325,7 @@ async def update_user_photo(
     user.client_photo = unique_filename
     await db.commit()
     await db.refresh(user)
+    invalidate_principal(update_data["user_type"], user)
 
     return {
         "message": "Profile photo updated successfully",
@@ -0,0 +1,91 @@
+import asyncio
+import logging
+import time
+from typing import Dict
+
+from sqlalchemy import select, update
+
+from app.core.config import settings
+from app.db.models import Note
+from app.db.session import async_session
+from app.ml_service import ThreadSafeModelHandler, ANALYSIS_FIELDS
+from app.embedding_index import embedding_index
+
+logger = logging.getLogger(__name__)
+
+
+class NoteAnalysisQueue:
+    """
+    Debounced background analysis of written notes. Every write of a note pushes its deadline back,
+    so a burst of edits of the same note ends up in a single analysis once the note settles down.
+    The queue lives in the worker process that handled the write.
+    """
+
+    def __init__(self, debounce: float):
+        self.debounce = debounce
+        self.deadlines: Dict[int, float] = {}
+        self.wakeup = asyncio.Event()
+
+    def schedule(self, note_id: int) -> None:
+        self.deadlines[note_id] = time.monotonic() + self.debounce
+        self.wakeup.set()
+
+    async def _wait(self, timeout: float | None) -> None:
+        self.wakeup.clear()
+        try:
+            await asyncio.wait_for(self.wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def run(self, model_handler: ThreadSafeModelHandler) -> None:
+        while True:
+            if not self.deadlines:
+                await self._wait(None)
+                continue
+
+            now = time.monotonic()
+            due = [note_id for note_id, deadline in self.deadlines.items() if deadline <= now]
+            if not due:
+                await self._wait(min(self.deadlines.values()) - now)
+                continue
+
+            for note_id in due:
+                del self.deadlines[note_id]
+            for note_id in due:
+                try:
+                    await self._analyze(note_id, model_handler)
+                except Exception:
+                    logger.exception("Background analysis of note %s failed", note_id)
+
+    async def _analyze(self, note_id: int, model_handler: ThreadSafeModelHandler) -> None:
+        # the session is closed before the model runs, so no transaction idles while it does
+        async with async_session() as db:
+            stmt = select(Note.client_id, Note.body, Note.updatedAt).where(Note.note_id == note_id)
+            result = await db.execute(stmt)
+            note = result.first()
+        if not note or not note.body or not note.body.strip():
+            return
+
+        analysis = await asyncio.to_thread(model_handler.analyze, note.body)
+
+        async with async_session() as db:
+            # Only store the result if the note was not edited while the model was running,
+            # an edit has already scheduled a fresh analysis
+            stmt = (
+                update(Note)
+                .where(Note.note_id == note_id, Note.updatedAt == note.updatedAt)
+                .values({field: analysis[field] for field in ANALYSIS_FIELDS})
+            )
+            await db.execute(stmt)
+            await db.commit()
+
+        embedding_index.invalidate(note.client_id)
+
+
+note_analysis_queue = NoteAnalysisQueue(settings.AUTO_ANALYZE_DEBOUNCE_SECONDS)
+
+
+def schedule_note_analysis(note_id: int) -> None:
+    """Queue a background analysis of the note if automatic analysis is enabled."""
+    if settings.AUTO_ANALYZE_NOTES:
+        note_analysis_queue.schedule(note_id)
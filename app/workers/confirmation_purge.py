@@ -0,0 +1,51 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select, delete
+
+from app.core.config import settings
+from app.db.models import ConfirmationRequest
+from app.db.session import async_session
+
+logger = logging.getLogger(__name__)
+
+
+async def purge_confirmation_codes() -> int:
+    """
+    Delete confirmation codes whose lifetime is over, used or not, in small batches.
+    Every batch is its own short transaction, so the purge never holds many row locks at once.
+    Codes used within their lifetime are kept until it ends, so reusing them still reports "Code already used".
+    Returns the number of deleted rows.
+    """
+    deleted = 0
+    while True:
+        cutoff = datetime.now(timezone.utc) - timedelta(minutes=settings.CODE_EXPIRE_MINUTES)
+        async with async_session() as db:
+            batch = (
+                select(ConfirmationRequest.confirmation_id)
+                .where(ConfirmationRequest.createdAt < cutoff)
+                .limit(settings.CONFIRMATION_PURGE_BATCH_SIZE)
+                .with_for_update(skip_locked=True)
+                .scalar_subquery()
+            )
+            result = await db.execute(
+                delete(ConfirmationRequest).where(ConfirmationRequest.confirmation_id.in_(batch))
+            )
+            await db.commit()
+
+        deleted += result.rowcount
+        if result.rowcount < settings.CONFIRMATION_PURGE_BATCH_SIZE:
+            return deleted
+
+
+async def run_confirmation_purge_worker() -> None:
+    while True:
+        try:
+            deleted = await purge_confirmation_codes()
+            if deleted:
+                logger.info("Purged %s expired confirmation codes", deleted)
+        except Exception:
+            logger.exception("Failed to purge expired confirmation codes")
+
+        await asyncio.sleep(settings.CONFIRMATION_PURGE_INTERVAL_SECONDS)
@@ -0,0 +1,140 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import and_, delete, or_, select, update
+
+from app.core.config import settings
+from app.core.email import build_email_message
+from app.core.smtp import smtp_pool
+from app.db.enums import OutboxStatusEnum
+from app.db.models import EmailOutbox
+from app.db.session import async_session
+
+logger = logging.getLogger(__name__)
+
+
+def _retry_delay(attempts: int) -> timedelta:
+    """Exponential backoff: base delay after the first failure, doubled after each next one, capped."""
+    seconds = settings.EMAIL_OUTBOX_BACKOFF_SECONDS * 2 ** (attempts - 1)
+    return timedelta(seconds=min(seconds, settings.EMAIL_OUTBOX_MAX_BACKOFF_SECONDS))
+
+
+async def drain_email_outbox() -> int:
+    """
+    Send one batch of due outbox messages. The batch is claimed first in a short transaction:
+    rows are picked with SKIP LOCKED and their next attempt is pushed a lease ahead, so other workers
+    skip them while they are being sent and no lock is held during the SMTP round trips.
+    A worker that dies mid-batch leaves its messages to be retried once the lease runs out.
+    Returns the number of processed messages.
+    """
+    async with async_session() as db:
+        now = datetime.now(timezone.utc)
+        due = (
+            select(EmailOutbox.outbox_id)
+            .where(EmailOutbox.status == OutboxStatusEnum.PENDING, EmailOutbox.next_attempt_at <= now)
+            .order_by(EmailOutbox.next_attempt_at)
+            .limit(settings.EMAIL_OUTBOX_BATCH_SIZE)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        stmt = (
+            update(EmailOutbox)
+            .where(EmailOutbox.outbox_id.in_(due))
+            .values(
+                attempts=EmailOutbox.attempts + 1,
+                next_attempt_at=now + timedelta(seconds=settings.EMAIL_OUTBOX_CLAIM_SECONDS)
+            )
+            .returning(EmailOutbox.outbox_id, EmailOutbox.recipient, EmailOutbox.subject, EmailOutbox.body,
+                       EmailOutbox.attempts)
+            .execution_options(synchronize_session=False)
+        )
+        result = await db.execute(stmt)
+        messages = result.all()
+        await db.commit()
+
+    if not messages:
+        return 0
+
+    # the whole batch goes out over the pooled connections, a few messages per SMTP session
+    errors = await smtp_pool.send_many([
+        build_email_message(message.recipient, message.subject, message.body) for message in messages
+    ])
+
+    outcomes = []
+    for message, error in zip(messages, errors):
+        if error is None:
+            outcomes.append({"outbox_id": message.outbox_id, "status": OutboxStatusEnum.SENT,
+                             "sent_at": datetime.now(timezone.utc)})
+        elif message.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+            outcomes.append({"outbox_id": message.outbox_id, "status": OutboxStatusEnum.DEAD,
+                             "last_error": str(error)[:1000]})
+            logger.error("Email %s moved to dead letters after %s attempts", message.outbox_id, message.attempts)
+        else:
+            outcomes.append({"outbox_id": message.outbox_id, "last_error": str(error)[:1000],
+                             "next_attempt_at": datetime.now(timezone.utc) + _retry_delay(message.attempts)})
+
+    async with async_session() as db:
+        await db.execute(update(EmailOutbox), outcomes)  # bulk UPDATE by primary key
+        await db.commit()
+    return len(messages)
+
+
+async def purge_email_outbox() -> int:
+    """
+    Delete delivered messages after EMAIL_OUTBOX_SENT_RETENTION_HOURS and dead letters after
+    EMAIL_OUTBOX_DEAD_RETENTION_DAYS, in small batches like the confirmation code purge.
+    Bodies carry confirmation codes in plain text, so they are not kept longer than needed.
+    Returns the number of deleted rows.
+    """
+    deleted = 0
+    while True:
+        now = datetime.now(timezone.utc)
+        async with async_session() as db:
+            batch = (
+                select(EmailOutbox.outbox_id)
+                .where(or_(
+                    and_(
+                        EmailOutbox.status == OutboxStatusEnum.SENT,
+                        EmailOutbox.sent_at < now - timedelta(hours=settings.EMAIL_OUTBOX_SENT_RETENTION_HOURS)
+                    ),
+                    and_(
+                        EmailOutbox.status == OutboxStatusEnum.DEAD,
+                        EmailOutbox.created_at < now - timedelta(days=settings.EMAIL_OUTBOX_DEAD_RETENTION_DAYS)
+                    )
+                ))
+                .limit(settings.EMAIL_OUTBOX_PURGE_BATCH_SIZE)
+                .with_for_update(skip_locked=True)
+                .scalar_subquery()
+            )
+            result = await db.execute(delete(EmailOutbox).where(EmailOutbox.outbox_id.in_(batch)))
+            await db.commit()
+
+        deleted += result.rowcount
+        if result.rowcount < settings.EMAIL_OUTBOX_PURGE_BATCH_SIZE:
+            return deleted
+
+
+async def run_email_outbox_worker() -> None:
+    while True:
+        try:
+            processed = await drain_email_outbox()
+        except Exception:
+            logger.exception("Failed to drain the email outbox")
+            processed = 0
+
+        # a full batch means there is probably more waiting, so go on without sleeping
+        if processed < settings.EMAIL_OUTBOX_BATCH_SIZE:
+            await asyncio.sleep(settings.EMAIL_OUTBOX_POLL_SECONDS)
+
+
+async def run_email_outbox_purge_worker() -> None:
+    while True:
+        try:
+            deleted = await purge_email_outbox()
+            if deleted:
+                logger.info("Purged %s old outbox emails", deleted)
+        except Exception:
+            logger.exception("Failed to purge the email outbox")
+
+        await asyncio.sleep(settings.EMAIL_OUTBOX_PURGE_INTERVAL_SECONDS)
@@ -0,0 +1,48 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select, delete
+
+from app.core.config import settings
+from app.db.models import NoteTombstone
+from app.db.session import async_session
+
+logger = logging.getLogger(__name__)
+
+
+async def purge_note_tombstones() -> int:
+    """
+    Delete note tombstones older than NOTES_SYNC_TOMBSTONE_RETENTION_DAYS, in small batches.
+    Clients whose sync cursor is older than that are told to do a full sync instead.
+    Returns the number of deleted rows.
+    """
+    deleted = 0
+    while True:
+        cutoff = datetime.now(timezone.utc) - timedelta(days=settings.NOTES_SYNC_TOMBSTONE_RETENTION_DAYS)
+        async with async_session() as db:
+            batch = (
+                select(NoteTombstone.note_id)
+                .where(NoteTombstone.deletedAt < cutoff)
+                .limit(settings.NOTES_TOMBSTONE_PURGE_BATCH_SIZE)
+                .with_for_update(skip_locked=True)
+                .scalar_subquery()
+            )
+            result = await db.execute(delete(NoteTombstone).where(NoteTombstone.note_id.in_(batch)))
+            await db.commit()
+
+        deleted += result.rowcount
+        if result.rowcount < settings.NOTES_TOMBSTONE_PURGE_BATCH_SIZE:
+            return deleted
+
+
+async def run_tombstone_purge_worker() -> None:
+    while True:
+        try:
+            deleted = await purge_note_tombstones()
+            if deleted:
+                logger.info("Purged %s old note tombstones", deleted)
+        except Exception:
+            logger.exception("Failed to purge old note tombstones")
+
+        await asyncio.sleep(settings.NOTES_TOMBSTONE_PURGE_INTERVAL_SECONDS)